@@ -0,0 +1,86 @@
+"""
+Главная точка входа арбитражного бота
+
+Запускает два компонента параллельно:
+  - PolymarketCLOBClient: WebSocket-прием книг ордеров -> Redis
+  - ArbitrageFinder: сканер аномалий P_yes + P_no < 1 по данным Redis
+
+Использование:
+    python main.py
+"""
+
+import asyncio
+import requests
+
+from config.settings import settings
+from src.client.polymarket_clob import PolymarketCLOBClient
+from src.engine.arb_finder import ArbitrageFinder
+from src.utils.logger import BotLogger
+
+# uvloop (libuv) ускоряет event loop в ~2 раза на WebSocket-нагрузке;
+# на Windows или без установленного пакета остаемся на стандартном цикле
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    uvloop = None
+
+logger = BotLogger(settings.LOG_FILE)
+
+
+def fetch_market_ids(limit: int = 20) -> list:
+    """Загрузка ID активных рынков через REST перед стартом"""
+    try:
+        response = requests.get(
+            f"{settings.POLYMARKET_REST_API}/markets",
+            params={"limit": limit, "closed": False},
+            timeout=10
+        )
+        response.raise_for_status()
+        markets = response.json()
+        return [
+            market["condition_id"]
+            for market in markets
+            if market.get("condition_id")
+        ]
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Не удалось загрузить список рынков: {e}")
+        return []
+
+
+async def run():
+    """Параллельный запуск WebSocket-клиента и сканера"""
+    market_ids = fetch_market_ids()
+    if not market_ids:
+        logger.error("Нет рынков для мониторинга, выход")
+        return
+
+    # Очередь обновлений: WebSocket-клиент будит сканер по рынку,
+    # чья книга изменилась, вместо опроса Redis каждые 100 мс
+    update_queue = asyncio.Queue(maxsize=1024)
+
+    clob_client = PolymarketCLOBClient(market_ids, update_queue=update_queue)
+    finder = ArbitrageFinder(update_queue=update_queue)
+
+    try:
+        await asyncio.gather(
+            clob_client.listen(),
+            finder.start(market_ids)
+        )
+    finally:
+        finder.stop()
+        await clob_client.stop()
+
+
+def main():
+    if uvloop is not None:
+        logger.info("⚡ Event loop: uvloop")
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        logger.info("🛑 Остановка по Ctrl+C")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@
 """
 
 import sys
+import json
+import mmap
+import pickle
 import asyncio
 import time
 from pathlib import Path
@@ -17,32 +20,163 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from config.settings import settings
 from src.utils.logger import BotLogger
-from src.utils.notifier import get_notifier
-from src.clients.redis_client import get_redis_client
+import aiohttp
+import numpy as np
 import requests
+import websockets
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson (Rust, SIMD) парсит JSON в 3-5 раз быстрее stdlib —
+# заметно на книгах ордеров и потоке WebSocket-сообщений
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
+# Снимок порогов стратегии при импорте: локальное имя модуля дешевле
+# цепочки settings.X на каждый вызов в горячем цикле сканирования
+_ARB_THRESHOLD = settings.ARB_THRESHOLD
+_MIN_LIQUIDITY_USD = settings.MIN_LIQUIDITY_USD
+
+# Numba компилирует батч-проверку в машинный код (LLVM, SIMD);
+# без numba остаемся на чистом NumPy — то же поведение, медленнее
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _arb_batch_numpy(yes_p, no_p, yes_s, no_s, thr, min_liq):
+    """NumPy-fallback: индексы рынков с арбитражем"""
+    sums = yes_p + no_p
+    volumes = np.minimum(yes_s, no_s)
+    return np.flatnonzero((sums < thr) & (volumes >= min_liq))
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _arb_batch(yes_p, no_p, yes_s, no_s, thr, min_liq):
+        """JIT-ядро: один проход по массивам без временных аллокаций"""
+        n = yes_p.shape[0]
+        hits = np.empty(n, dtype=np.int64)
+        k = 0
+        for i in range(n):
+            s = yes_p[i] + no_p[i]
+            v = yes_s[i] if yes_s[i] < no_s[i] else no_s[i]
+            if s < thr and v >= min_liq:
+                hits[k] = i
+                k += 1
+        return hits[:k]
+
+    # Прогрев: компиляция при импорте, а не на первой итерации
+    _arb_batch(np.zeros(1), np.zeros(1), np.zeros(1), np.zeros(1), 1.0, 0.0)
+else:
+    _arb_batch = _arb_batch_numpy
 
 
 class MarketExplorer:
     """Простой сканер для поиска арбитражных возможностей"""
 
     def __init__(self):
+        # Telegram- и Redis-клиенты импортируем лениво: их цепочки
+        # зависимостей стоят сотни мс на холодном старте и не нужны
+        # при --help или ошибке конфигурации
+        from src.utils.notifier import get_notifier
+        from src.client.redis_client import get_redis_client
+
         self.logger = BotLogger(settings.LOG_FILE)
         self.notifier = get_notifier()
         self.redis = get_redis_client()
         self.running = False
 
+        # HTTP-сессия для асинхронных запросов (создается в scan_loop)
+        self.session: aiohttp.ClientSession = None
+
+        # Ограничитель параллелизма для одиночных запросов /book:
+        # вежливый rate limit вместо искусственных sleep между рынками
+        self.sem = asyncio.Semaphore(8)
+
+        # Очередь уведомлений: горячий путь сканирования только кладет,
+        # HTTP к Telegram выполняет фоновая задача
+        self.notify_q = asyncio.Queue(maxsize=256)
+
+        # Keep-alive сессия для синхронных REST-запросов:
+        # переиспользуем TCP/TLS-соединение вместо рукопожатия на каждый вызов
+        self.rest = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2)
+        )
+        self.rest.mount("https://", adapter)
+
+        # TTL-кэш метаданных рынков: id/question/token_id почти статичны,
+        # каждые 10с меняются только книги ордеров
+        self._markets_cache = None
+        self._markets_cache_ts = 0.0
+        self._markets_cache_ttl = 300  # 5 минут
+
+        # Плоский индекс (market_id, question, yes_token, no_token),
+        # пересобирается при каждой (пере)загрузке метаданных
+        self.market_index = []
+
+        # Возможности текущей итерации — пишутся в Redis одним pipeline
+        self._pending_opps = []
+
+        # Кэш книг в пределах одной итерации: повторный запрос того же
+        # токена (рынки с общими исходами) стоит dict-lookup вместо RTT
+        self._iter_books = {}
+
         # Статистика
         self.opportunities_found = 0
         self.markets_scanned = 0
         self.start_time = None
 
-    def get_active_markets(self, limit: int = 50):
+    async def get_active_markets(self, limit: int = 50):
         """
         Получение списка активных рынков через REST API
 
         Returns:
             List[dict]: Список рынков с их ID и метаданными
         """
+        now = time.time()
+
+        # Метаданные свежие — сеть не трогаем
+        if (self._markets_cache is not None
+                and now - self._markets_cache_ts < self._markets_cache_ttl):
+            return self._markets_cache
+
+        # Холодный старт: сначала снимок с диска (~1 мс против ~300 мс REST)
+        if self._markets_cache is None:
+            snapshot = self._load_markets_snapshot()
+            if snapshot:
+                self._markets_cache = snapshot
+                self._markets_cache_ts = now
+                self.market_index = self._build_market_index(snapshot)
+                self.logger.info(
+                    f"Рынки загружены из снимка на диске: {len(snapshot)}"
+                )
+                return snapshot
+
+        # Затем пробуем снимок из Redis (переживает рестарты)
+        if self._markets_cache is None and self.redis.connected:
+            try:
+                snapshot = await self.redis.client.get("markets:snapshot")
+                if snapshot:
+                    self._markets_cache = _loads(snapshot)
+                    self._markets_cache_ts = now
+                    self.market_index = self._build_market_index(self._markets_cache)
+                    self.logger.info(
+                        f"Рынки загружены из Redis-кэша: {len(self._markets_cache)}"
+                    )
+                    return self._markets_cache
+            except Exception as e:
+                self.logger.debug(f"Не удалось прочитать кэш рынков: {e}")
+
         try:
             url = f"{settings.POLYMARKET_REST_API}/markets"
             params = {
@@ -50,18 +184,99 @@ class MarketExplorer:
                 "closed": False  # Только активные рынки
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.rest.get(url, params=params, timeout=10)
             response.raise_for_status()
 
-            markets = response.json()
+            markets = _loads(response.content)
             self.logger.info(f"Загружено {len(markets)} активных рынков")
+
+            self._markets_cache = markets
+            self._markets_cache_ts = now
+            self.market_index = self._build_market_index(markets)
+
+            # Снимок в Redis, чтобы рестарт не платил за холодный кэш
+            if self.redis.connected:
+                try:
+                    await self.redis.client.setex(
+                        "markets:snapshot",
+                        self._markets_cache_ttl,
+                        _dumps(markets)
+                    )
+                except Exception as e:
+                    self.logger.debug(f"Не удалось сохранить кэш рынков: {e}")
+
+            # И на диск — следующий рестарт не пойдет в сеть
+            self._save_markets_snapshot(markets)
+
             return markets
 
         except requests.exceptions.RequestException as e:
             self.logger.error(f"Ошибка при загрузке рынков: {e}")
             return []
 
-    def get_orderbook(self, token_id: str):
+    def _snapshot_path(self) -> Path:
+        """Путь к дисковому снимку метаданных рынков"""
+        return settings.DATA_DIR / "markets.pkl"
+
+    def _load_markets_snapshot(self):
+        """
+        Загрузка снимка рынков с диска через mmap
+
+        Снимок свежее TTL читается из page cache и распаковывается
+        pickle за ~1 мс — вместо REST-запроса и разбора JSON.
+        """
+        path = self._snapshot_path()
+        try:
+            if not path.exists():
+                return None
+            if time.time() - path.stat().st_mtime > self._markets_cache_ttl:
+                return None
+
+            with open(path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return pickle.loads(mm)
+        except Exception as e:
+            self.logger.debug(f"Не удалось прочитать снимок рынков: {e}")
+            return None
+
+    def _save_markets_snapshot(self, markets: list):
+        """Сохранение снимка рынков на диск"""
+        try:
+            settings.DATA_DIR.mkdir(parents=True, exist_ok=True)
+            with open(self._snapshot_path(), "wb") as f:
+                pickle.dump(markets, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.debug(f"Не удалось сохранить снимок рынков: {e}")
+
+    @staticmethod
+    def _build_market_index(markets: list) -> list:
+        """
+        Построение плоского индекса рынков
+
+        Вычисляем (market_id, question, yes_token, no_token) один раз
+        при загрузке метаданных — горячий путь сканирования работает
+        с кортежами вместо цепочек .get() по словарям.
+        """
+        index = []
+        for market in markets:
+            tokens = market.get("tokens", [])
+            if len(tokens) < 2:
+                continue
+
+            yes_token = tokens[0].get("token_id")
+            no_token = tokens[1].get("token_id")
+            if not yes_token or not no_token:
+                continue
+
+            index.append((
+                market.get("id"),
+                market.get("question", "Unknown"),
+                yes_token,
+                no_token
+            ))
+        return index
+
+    async def get_orderbook(self, token_id: str):
         """
         Получение книги ордеров для конкретного токена
 
@@ -71,19 +286,77 @@ class MarketExplorer:
         Returns:
             dict: Книга ордеров с asks и bids
         """
+        cached = self._iter_books.get(token_id)
+        if cached is not None:
+            return cached
+
         try:
             url = f"{settings.POLYMARKET_REST_API}/book"
             params = {"token_id": token_id}
 
-            response = requests.get(url, params=params, timeout=5)
-            response.raise_for_status()
+            async with self.sem:
+                async with self.session.get(url, params=params, timeout=5) as response:
+                    response.raise_for_status()
+                    book = _loads(await response.read())
 
-            return response.json()
+            self._iter_books[token_id] = book
+            return book
 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             self.logger.debug(f"Ошибка при получении orderbook для {token_id}: {e}")
             return None
 
+    async def get_orderbooks(self, token_ids: list) -> dict:
+        """
+        Батч-загрузка книг ордеров для списка токенов
+
+        Один POST /books покрывает все токены итерации вместо
+        пары последовательных GET /book на каждый рынок.
+
+        Args:
+            token_ids: Список ID токенов
+
+        Returns:
+            dict: token_id -> книга ордеров
+        """
+        if not token_ids:
+            return {}
+
+        # Уже загруженные в этой итерации токены не запрашиваем повторно
+        books = {t: self._iter_books[t] for t in token_ids
+                 if t in self._iter_books}
+        missing = list(dict.fromkeys(
+            t for t in token_ids if t not in books
+        ))
+
+        if not missing:
+            return books
+
+        try:
+            url = f"{settings.POLYMARKET_REST_API}/books"
+            payload = [{"token_id": t} for t in missing]
+
+            async with self.session.post(url, json=payload, timeout=10) as response:
+                response.raise_for_status()
+                fetched = _loads(await response.read())
+
+            for book in fetched:
+                token_id = book.get("asset_id")
+                self._iter_books[token_id] = book
+                books[token_id] = book
+            return books
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Батч-запрос /books не удался: {e}")
+            # Fallback: параллельные одиночные запросы
+            results = await asyncio.gather(
+                *(self.get_orderbook(t) for t in missing)
+            )
+            books.update(
+                {t: book for t, book in zip(missing, results) if book}
+            )
+            return books
+
     def calculate_arbitrage(self, yes_price: float, no_price: float,
                             yes_size: float, no_size: float):
         """
@@ -94,51 +367,40 @@ class MarketExplorer:
         """
         price_sum = yes_price + no_price
 
-        # Проверка на арбитраж
-        if price_sum < settings.ARB_THRESHOLD:
-            # Расчет потенциальной прибыли
+        # Тернарник вместо builtin min(): без упаковки *args-кортежа
+        max_volume = yes_size if yes_size < no_size else no_size
+
+        # Оба условия одним предикатом: прибыль считаем только
+        # для рынков, прошедших и порог, и фильтр ликвидности
+        if price_sum < _ARB_THRESHOLD and max_volume >= _MIN_LIQUIDITY_USD:
             # Если мы купим по 1$ каждого исхода, то заработаем (1 - price_sum)
             profit_per_dollar = 1.0 - price_sum
             profit_percent = (profit_per_dollar / price_sum) * 100
 
-            # Максимальный объем ограничен минимальной ликвидностью
-            max_volume = min(yes_size, no_size)
-
-            # Проверка на минимальную ликвидность
-            if max_volume >= settings.MIN_LIQUIDITY_USD:
-                return {
-                    "yes_price": yes_price,
-                    "no_price": no_price,
-                    "price_sum": price_sum,
-                    "profit_percent": profit_percent,
-                    "max_volume": max_volume,
-                    "expected_profit_usd": profit_per_dollar * max_volume
-                }
+            return {
+                "yes_price": yes_price,
+                "no_price": no_price,
+                "price_sum": price_sum,
+                "profit_percent": profit_percent,
+                "max_volume": max_volume,
+                "expected_profit_usd": profit_per_dollar * max_volume
+            }
 
         return None
 
-    def scan_market(self, market: dict):
+    def scan_market(self, market_id: str, question: str,
+                    yes_token: str, no_token: str, books: dict):
         """
         Сканирование одного рынка на наличие арбитража
 
         Args:
-            market: Данные рынка из API
+            market_id, question, yes_token, no_token: Запись market_index
+            books: Предзагруженные книги ордеров (token_id -> book)
         """
         try:
-            market_id = market.get("id")
-            question = market.get("question", "Unknown")
-
-            # Получаем токены Yes и No
-            tokens = market.get("tokens", [])
-            if len(tokens) < 2:
-                return
-
-            yes_token = tokens[0].get("token_id")
-            no_token = tokens[1].get("token_id")
-
-            # Получаем книги ордеров для обоих исходов
-            yes_book = self.get_orderbook(yes_token)
-            no_book = self.get_orderbook(no_token)
+            # Книги ордеров уже загружены (батчем или из WS-потока)
+            yes_book = books.get(yes_token)
+            no_book = books.get(no_token)
 
             if not yes_book or not no_book:
                 return
@@ -165,49 +427,149 @@ class MarketExplorer:
             )
 
             if opportunity:
-                self.opportunities_found += 1
-
-                # Логирование
-                self.logger.opportunity_found(
-                    market_id=market_id,
-                    yes_price=yes_price,
-                    no_price=no_price,
-                    profit=opportunity["profit_percent"]
+                self.report_opportunity(
+                    market_id, question,
+                    yes_price, no_price, yes_size, no_size,
+                    opportunity
                 )
 
-                # Детальный вывод
-                print("\n" + "=" * 70)
-                print(f"🎯 АРБИТРАЖНАЯ ВОЗМОЖНОСТЬ #{self.opportunities_found}")
-                print("=" * 70)
-                print(f"📊 Рынок: {question[:60]}")
-                print(f"🆔 Market ID: {market_id}")
-                print(f"\n💰 ЦЕНЫ:")
-                print(f"   Yes: ${yes_price:.4f} (объем: ${yes_size:.2f})")
-                print(f"   No:  ${no_price:.4f} (объем: ${no_size:.2f})")
-                print(f"   Сумма: ${opportunity['price_sum']:.4f}")
-                print(f"\n📈 ПРИБЫЛЬ:")
-                print(f"   Процент: {opportunity['profit_percent']:.2f}%")
-                print(f"   Макс. объем: ${opportunity['max_volume']:.2f}")
-                print(f"   Ожидаемая прибыль: ${opportunity['expected_profit_usd']:.2f}")
-                print(f"\n⏰ Время: {datetime.now().strftime('%H:%M:%S')}")
-                print("=" * 70 + "\n")
-
-                # Отправка уведомления в Telegram
-                if settings.TELEGRAM_ENABLED and settings.NOTIFY_OPPORTUNITIES:
-                    asyncio.create_task(
-                        self.notifier.notify_opportunity(
-                            market_id=market_id,
-                            yes_price=yes_price,
-                            no_price=no_price,
-                            profit=opportunity["profit_percent"]
-                        )
-                    )
-
             self.markets_scanned += 1
 
         except Exception as e:
             self.logger.error(f"Ошибка при сканировании рынка: {e}", exc_info=True)
 
+    def scan_markets(self, books: dict):
+        """
+        Векторизованная проверка арбитража по всем рынкам за один проход
+
+        Извлекаем цены/объемы в NumPy-массивы и считаем условие
+        арбитража одной операцией вместо Python-цикла по рынкам.
+
+        Args:
+            books: Предзагруженные книги ордеров (token_id -> book)
+        """
+        rows = []
+
+        for market_id, question, yes_token, no_token in self.market_index:
+            yes_book = books.get(yes_token)
+            no_book = books.get(no_token)
+            if not yes_book or not no_book:
+                continue
+
+            yes_asks = yes_book.get("asks", [])
+            no_asks = no_book.get("asks", [])
+            if not yes_asks or not no_asks:
+                continue
+
+            rows.append((
+                market_id,
+                question,
+                float(yes_asks[0]["price"]),
+                float(no_asks[0]["price"]),
+                float(yes_asks[0]["size"]),
+                float(no_asks[0]["size"])
+            ))
+            self.markets_scanned += 1
+
+        if not rows:
+            return
+
+        yes_prices = np.array([r[2] for r in rows])
+        no_prices = np.array([r[3] for r in rows])
+        yes_sizes = np.array([r[4] for r in rows])
+        no_sizes = np.array([r[5] for r in rows])
+
+        # JIT-ядро (или NumPy-fallback) отбирает рынки с арбитражем
+        hits = _arb_batch(
+            yes_prices, no_prices, yes_sizes, no_sizes,
+            _ARB_THRESHOLD, _MIN_LIQUIDITY_USD
+        )
+
+        for i in hits:
+            market_id, question, yes_price, no_price, yes_size, no_size = rows[i]
+            price_sum = yes_price + no_price
+            max_volume = yes_size if yes_size < no_size else no_size
+            profit_per_dollar = 1.0 - price_sum
+
+            opportunity = {
+                "yes_price": yes_price,
+                "no_price": no_price,
+                "price_sum": price_sum,
+                "profit_percent": (profit_per_dollar / price_sum) * 100,
+                "max_volume": max_volume,
+                "expected_profit_usd": profit_per_dollar * max_volume
+            }
+            self.report_opportunity(
+                market_id, question,
+                yes_price, no_price, yes_size, no_size,
+                opportunity
+            )
+
+    def report_opportunity(self, market_id: str, question: str,
+                           yes_price: float, no_price: float,
+                           yes_size: float, no_size: float,
+                           opportunity: dict):
+        """Логирование и уведомление о найденной возможности"""
+        self.opportunities_found += 1
+        self._pending_opps.append((market_id, opportunity["profit_percent"]))
+
+        # Логирование
+        self.logger.opportunity_found(
+            market_id=market_id,
+            yes_price=yes_price,
+            no_price=no_price,
+            profit=opportunity["profit_percent"]
+        )
+
+        # Детальный вывод одной записью: 15 отдельных print() — это
+        # 15 write()-сисколлов, блокирующих event loop на горячем пути
+        self.logger.info(
+            "\n" + "=" * 70 + "\n"
+            f"🎯 АРБИТРАЖНАЯ ВОЗМОЖНОСТЬ #{self.opportunities_found}\n"
+            + "=" * 70 + "\n"
+            f"📊 Рынок: {question[:60]}\n"
+            f"🆔 Market ID: {market_id}\n"
+            f"\n💰 ЦЕНЫ:\n"
+            f"   Yes: ${yes_price:.4f} (объем: ${yes_size:.2f})\n"
+            f"   No:  ${no_price:.4f} (объем: ${no_size:.2f})\n"
+            f"   Сумма: ${opportunity['price_sum']:.4f}\n"
+            f"\n📈 ПРИБЫЛЬ:\n"
+            f"   Процент: {opportunity['profit_percent']:.2f}%\n"
+            f"   Макс. объем: ${opportunity['max_volume']:.2f}\n"
+            f"   Ожидаемая прибыль: ${opportunity['expected_profit_usd']:.2f}\n"
+            f"\n⏰ Время: {datetime.now().strftime('%H:%M:%S')}\n"
+            + "=" * 70
+        )
+
+        # Уведомление в Telegram через фоновую очередь
+        if settings.TELEGRAM_ENABLED and settings.NOTIFY_OPPORTUNITIES:
+            item = (market_id, yes_price, no_price, opportunity["profit_percent"])
+            try:
+                self.notify_q.put_nowait(item)
+            except asyncio.QueueFull:
+                # Backpressure: выбрасываем самое старое уведомление;
+                # task_done обязателен, иначе счетчик незавершенных
+                # задач растет и notify_q.join() при остановке виснет
+                self.notify_q.get_nowait()
+                self.notify_q.task_done()
+                self.notify_q.put_nowait(item)
+
+    async def _notifier_worker(self):
+        """Фоновая отправка Telegram-уведомлений из очереди"""
+        while True:
+            market_id, yes_price, no_price, profit = await self.notify_q.get()
+            try:
+                await self.notifier.notify_opportunity(
+                    market_id=market_id,
+                    yes_price=yes_price,
+                    no_price=no_price,
+                    profit=profit
+                )
+            except Exception as e:
+                self.logger.debug(f"Не удалось отправить уведомление: {e}")
+            finally:
+                self.notify_q.task_done()
+
     async def scan_loop(self, interval: int = 10):
         """
         Основной цикл сканирования
@@ -218,6 +580,26 @@ class MarketExplorer:
         self.running = True
         self.start_time = time.time()
 
+        # Одна сессия на весь цикл работы сканера.
+        # AsyncResolver (aiodns) + ttl_dns_cache: имя clob.polymarket.com
+        # резолвится раз в 10 минут, а не на каждое новое соединение
+        connector = aiohttp.TCPConnector(
+            limit=64,
+            ttl_dns_cache=600,
+            resolver=aiohttp.AsyncResolver()
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
+
+        # Redis подключаем здесь: connect() асинхронный
+        if not self.redis.connected:
+            await self.redis.connect()
+
+        # Фоновый отправитель уведомлений
+        notifier_task = asyncio.create_task(self._notifier_worker())
+
         self.logger.info("🚀 Запуск сканера арбитражных возможностей")
         self.logger.info(f"⚙️  Настройки: Threshold={settings.ARB_THRESHOLD}, "
                          f"Min Profit={settings.MIN_PROFIT_PERCENT}%")
@@ -239,17 +621,47 @@ class MarketExplorer:
                 self.logger.info(f"{'=' * 50}")
 
                 # Получаем активные рынки
-                markets = self.get_active_markets(limit=20)
+                markets = await self.get_active_markets(limit=20)
 
                 if not markets:
                     self.logger.warning("Не удалось загрузить рынки")
                     await asyncio.sleep(interval)
                     continue
 
-                # Сканируем каждый рынок
-                for market in markets:
-                    self.scan_market(market)
-                    await asyncio.sleep(0.5)  # Небольшая задержка между запросами
+                # Новая итерация — старые книги невалидны
+                self._iter_books.clear()
+
+                # Все токены берем из предрассчитанного индекса
+                token_ids = [
+                    token
+                    for entry in self.market_index
+                    for token in entry[2:]
+                ]
+
+                books = await self.get_orderbooks(token_ids)
+
+                # Векторизованная проверка всех рынков одним проходом
+                self.scan_markets(books)
+
+                # Все записи итерации — одним pipeline (1 RTT вместо N)
+                if self.redis.connected:
+                    try:
+                        pipe = self.redis.pipeline()
+                        for token_id, book in books.items():
+                            pipe.setex(
+                                f"book:{token_id}",
+                                settings.REDIS_KEY_TTL,
+                                _dumps(book)
+                            )
+                        if self._pending_opps:
+                            pipe.zadd(
+                                "opportunities",
+                                dict(self._pending_opps)
+                            )
+                        await pipe.execute()
+                    except Exception as e:
+                        self.logger.debug(f"Не удалось записать итерацию в Redis: {e}")
+                self._pending_opps.clear()
 
                 # Статистика
                 elapsed = time.time() - self.start_time
@@ -270,13 +682,106 @@ class MarketExplorer:
                 self.logger.error(f"Ошибка в цикле сканирования: {e}", exc_info=True)
                 await asyncio.sleep(interval)
 
+        # Досылаем накопленные уведомления и останавливаем фон
+        await self.notify_q.join()
+        notifier_task.cancel()
+
         # Финальная статистика
         await self.print_final_stats()
+        await self.session.close()
+
+    async def stream_loop(self):
+        """
+        Событийный режим сканирования через WebSocket
+
+        Вместо повторной выгрузки всех книг каждые N секунд подписываемся
+        на канал 'market' и пересчитываем арбитраж только для рынка,
+        по которому пришла дельта. Латентность обнаружения падает
+        с ~10 с до долей секунды, трафик — на порядки.
+        """
+        self.running = True
+        self.start_time = time.time()
+
+        # Redis подключаем здесь: connect() асинхронный
+        if not self.redis.connected:
+            await self.redis.connect()
+
+        # Фоновый отправитель уведомлений
+        notifier_task = asyncio.create_task(self._notifier_worker())
+
+        self.logger.info("🚀 Запуск сканера в режиме WebSocket")
+
+        # Метаданные рынков загружаем один раз через REST
+        markets = await self.get_active_markets(limit=20)
+        if not markets:
+            self.logger.error("Не удалось загрузить рынки, выход")
+            return
+
+        # token_id -> запись индекса, чтобы находить рынок по дельте
+        token_to_market = {}
+        for entry in self.market_index:
+            token_to_market[entry[2]] = entry
+            token_to_market[entry[3]] = entry
+
+        # Актуальное состояние книг в памяти (token_id -> book)
+        books = {}
+
+        # Уведомление о старте
+        if settings.TELEGRAM_ENABLED:
+            await self.notifier.notify_bot_status(
+                "started",
+                f"WebSocket-сканер запущен\nРынков: {len(markets)}"
+            )
+
+        while self.running:
+            try:
+                async with websockets.connect(settings.POLYMARKET_WS_URL) as ws:
+                    # Одна подписка на все токены
+                    await ws.send(json.dumps({
+                        "type": "market",
+                        "assets_ids": list(token_to_market)
+                    }))
+                    self.logger.info(
+                        f"📡 Подписка оформлена на {len(token_to_market)} токенов"
+                    )
+
+                    async for message in ws:
+                        events = _loads(message)
+                        if isinstance(events, dict):
+                            events = [events]
+
+                        for event in events:
+                            token_id = event.get("asset_id")
+                            entry = token_to_market.get(token_id)
+                            if not entry:
+                                continue
+
+                            if not event.get("asks"):
+                                continue
+
+                            # Обновляем книгу и пересчитываем только этот рынок
+                            books[token_id] = event
+                            self.scan_market(*entry, books)
+
+            except websockets.exceptions.ConnectionClosed:
+                self.logger.warning("WebSocket закрыт, переподключение через 5с...")
+                await asyncio.sleep(5)
+            except Exception as e:
+                self.logger.error(f"Ошибка в WebSocket-цикле: {e}", exc_info=True)
+                await asyncio.sleep(5)
+
+        await self.notify_q.join()
+        notifier_task.cancel()
+
+        await self.print_final_stats()
 
     async def print_final_stats(self):
         """Вывод финальной статистики"""
         elapsed = time.time() - self.start_time
 
+        # Досылаем буферизованные логи на диск перед выводом итогов
+        self.logger.flush()
+
         print("\n" + "=" * 70)
         print("📊 ФИНАЛЬНАЯ СТАТИСТИКА")
         print("=" * 70)
@@ -324,7 +829,12 @@ async def main():
     explorer = MarketExplorer()
 
     try:
-        await explorer.scan_loop(interval=10)
+        # --rest: старый режим опроса REST каждые 10с
+        # по умолчанию: событийный WebSocket-режим
+        if "--rest" in sys.argv:
+            await explorer.scan_loop(interval=10)
+        else:
+            await explorer.stream_loop()
     except KeyboardInterrupt:
         print("\n⚠️  Остановка сканера...")
         explorer.stop()
@@ -333,4 +843,12 @@ async def main():
 
 
 if __name__ == "__main__":
+    # uvloop (libuv) в 2-4 раза быстрее стандартного selector-цикла
+    # на Linux; на Windows или без пакета работаем на стандартном
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     asyncio.run(main())
\ No newline at end of file
@@ -9,6 +9,7 @@
 import requests
 import time
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 
 
 class SimpleScanner:
@@ -19,12 +20,19 @@ class SimpleScanner:
         self.api_url = "https://clob.polymarket.com"
         self.opportunities = []
 
+        # Keep-alive сессия: одно TCP/TLS-соединение на все запросы
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        )
+
     def get_markets(self, limit=20):
         """Получить список активных рынков"""
         try:
             url = f"{self.api_url}/markets"
             params = {"limit": limit, "closed": False}
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=10)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -36,22 +44,38 @@ class SimpleScanner:
         try:
             url = f"{self.api_url}/book"
             params = {"token_id": token_id}
-            response = requests.get(url, params=params, timeout=5)
+            response = self.session.get(url, params=params, timeout=5)
             response.raise_for_status()
             return response.json()
         except:
             return None
 
-    def check_arbitrage(self, market):
+    def get_orderbooks(self, token_ids):
+        """Получить книги ордеров для всех токенов одним запросом"""
+        if not token_ids:
+            return {}
+        try:
+            url = f"{self.api_url}/books"
+            payload = [{"token_id": t} for t in token_ids]
+            response = self.session.post(url, json=payload, timeout=10)
+            response.raise_for_status()
+            books = response.json()
+            return {book.get("asset_id"): book for book in books}
+        except Exception as e:
+            print(f"⚠️  Батч-запрос не удался ({e}), переходим на одиночные")
+            return {t: book for t in token_ids
+                    if (book := self.get_orderbook(t))}
+
+    def check_arbitrage(self, market, books):
         """Проверить рынок на арбитраж"""
         try:
             tokens = market.get("tokens", [])
             if len(tokens) < 2:
                 return None
 
-            # Получаем книги ордеров
-            yes_book = self.get_orderbook(tokens[0]["token_id"])
-            no_book = self.get_orderbook(tokens[1]["token_id"])
+            # Книги ордеров уже загружены батчем в scan_once
+            yes_book = books.get(tokens[0]["token_id"])
+            no_book = books.get(tokens[1]["token_id"])
 
             if not yes_book or not no_book:
                 return None
@@ -69,11 +93,11 @@ class SimpleScanner:
             no_size = float(no_asks[0]["size"])
 
             price_sum = yes_price + no_price
+            max_volume = yes_size if yes_size < no_size else no_size
 
             # Проверка на арбитраж
             if price_sum < self.threshold:
                 profit_percent = ((1.0 - price_sum) / price_sum) * 100
-                max_volume = min(yes_size, no_size)
 
                 return {
                     "market": market.get("question", "Unknown")[:60],
@@ -101,18 +125,21 @@ class SimpleScanner:
         markets = self.get_markets(limit=20)
         print(f"📊 Загружено рынков: {len(markets)}")
 
+        # Один батч-запрос на все книги ордеров вместо 2 запросов на рынок
+        token_ids = [t["token_id"] for m in markets
+                     for t in m.get("tokens", [])[:2] if t.get("token_id")]
+        books = self.get_orderbooks(token_ids)
+
         found = 0
         for i, market in enumerate(markets, 1):
             print(f"[{i}/{len(markets)}] Проверка: {market.get('question', '')[:50]}...", end="\r")
 
-            opp = self.check_arbitrage(market)
+            opp = self.check_arbitrage(market, books)
             if opp:
                 found += 1
                 self.opportunities.append(opp)
                 self.print_opportunity(opp, found)
 
-            time.sleep(0.3)  # Задержка между запросами
-
         print(f"\n✅ Сканирование завершено. Найдено возможностей: {found}")
 
     def print_opportunity(self, opp, num):
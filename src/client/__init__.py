@@ -1,14 +1,21 @@
 """Клиенты для подключения к внешним сервисам"""
 
 # Эти строки позволяют делать импорт короче:
-# вместо: from src.clients.redis_client import RedisClient
-# можно будет писать: from src.clients import RedisClient
+# вместо: from src.client.redis_client import RedisClient
+# можно будет писать: from src.client import RedisClient
 
-try:
-    from .redis_client import RedisClient
-    from .polymarket_clob import PolymarketClient
-except ImportError:
-    # Если файлов еще нет, Python не выдаст ошибку при запуске
-    pass
+# Ленивая загрузка (PEP 562): подмодуль импортируется при первом
+# обращении к атрибуту, а не при импорте пакета — тому, кому нужен
+# только Redis, не приходится грузить цепочку зависимостей CLOB-клиента
 
-__all__ = ["RedisClient", "PolymarketClient"]
\ No newline at end of file
+__all__ = ["RedisClient", "get_redis_client", "PolymarketCLOBClient"]
+
+
+def __getattr__(name):
+    if name in ("RedisClient", "get_redis_client"):
+        from . import redis_client
+        return getattr(redis_client, name)
+    if name == "PolymarketCLOBClient":
+        from .polymarket_clob import PolymarketCLOBClient
+        return PolymarketCLOBClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
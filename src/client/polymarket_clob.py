@@ -1,11 +1,22 @@
 import json
+import logging
 import asyncio
 import websockets
 import time
 from typing import Callable, Optional, List
 from config.settings import settings
 from src.utils.logger import setup_logger
-from src.clients.redis_client import get_redis_client
+from src.client.redis_client import get_redis_client
+
+# orjson парсит входящие фреймы (bytes или str) в 3-10 раз быстрее
+# stdlib json — это доминирующая Python-стоимость на каждый тик
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps_str = lambda obj: orjson.dumps(obj).decode()
+except ImportError:
+    _loads = json.loads
+    _dumps_str = json.dumps
 
 logger = setup_logger("PolymarketCLOB")
 
@@ -16,7 +27,8 @@ class PolymarketCLOBClient:
     Отвечает ТОЛЬКО за получение данных и запись в Redis
     """
 
-    def __init__(self, market_ids: List[str]):
+    def __init__(self, market_ids: List[str],
+                 update_queue: Optional[asyncio.Queue] = None):
         self.ws_url = settings.POLYMARKET_WS_URL
         self.market_ids = market_ids
         self.websocket = None
@@ -25,13 +37,44 @@ class PolymarketCLOBClient:
         self.reconnect_delay = 5
         self.max_reconnect_delay = 60
 
+        # Очередь для событийного сканера: после записи книги в Redis
+        # сюда кладется market_id, и сканер проверяет только его
+        self.update_queue = update_queue
+
+        # Диспетчеризация сообщений по типу: O(1) dict-lookup вместо
+        # линейной if/elif-лестницы на каждом из тысяч сообщений в секунду
+        self._handlers = {
+            "book_update": self.process_orderbook_update,
+            "subscribed": self._on_subscribed,
+            "error": self._on_error
+        }
+
+        # Последние виденные (price, size) по (market_id, side):
+        # канал book шлет полные снапшоты, и неизменившиеся обновления
+        # не стоят ни записи в Redis, ни пробуждения сканера
+        self._last_book: dict = {}
+
+        # Буфер записей в Redis: обновления копятся и уходят пачкой
+        # через pipeline, вместо одного SETEX-round-trip на сообщение
+        self._write_buffer: List[tuple] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_interval = 0.005  # 5 мс
+
+        # Дедлайн продления TTL: тихие книги не перезаписываются
+        # из-за дедупликации, но и истечь в Redis не должны
+        self._ttl_refresh_deadline = 0.0
+
     async def connect(self):
         """Установка WebSocket соединения"""
         try:
             self.websocket = await websockets.connect(
                 self.ws_url,
                 ping_interval=20,
-                ping_timeout=10
+                ping_timeout=10,
+                max_size=2 ** 20,
+                # Без permessage-deflate: JSON-фреймы мелкие, накладные
+                # расходы inflate на каждый тик дороже экономии трафика
+                compression=None
             )
             logger.info(f"Connected to Polymarket WebSocket: {self.ws_url}")
             return True
@@ -45,19 +88,26 @@ class PolymarketCLOBClient:
             logger.error("WebSocket not connected")
             return False
 
-        for market_id in self.market_ids:
-            subscribe_msg = {
+        # Все сообщения сериализуем заранее и шлем одной пачкой через
+        # gather: N подписок ложатся в TCP-буфер за одну итерацию цикла
+        # вместо N последовательных await (N * RTT на старте)
+        messages = [
+            _dumps_str({
                 "type": "subscribe",
                 "channel": "book",
                 "market": market_id
-            }
+            })
+            for market_id in self.market_ids
+        ]
 
-            try:
-                await self.websocket.send(json.dumps(subscribe_msg))
-                logger.info(f"Subscribed to market: {market_id}")
-            except Exception as e:
-                logger.error(f"Failed to subscribe to market {market_id}: {e}")
-                return False
+        try:
+            await asyncio.gather(
+                *(self.websocket.send(msg) for msg in messages)
+            )
+            logger.info(f"Subscribed to {len(self.market_ids)} markets")
+        except Exception as e:
+            logger.error(f"Failed to subscribe to markets: {e}")
+            return False
 
         return True
 
@@ -73,92 +123,168 @@ class PolymarketCLOBClient:
             "timestamp": 1234567890
         }
         """
-        try:
-            market_id = data.get("market")
-            timestamp = data.get("timestamp", time.time())
-
-            # Получаем лучшие цены продажи (asks) для Yes и No
-            # В Polymarket каждый исход торгуется отдельно
-            asks = data.get("asks", [])
-
-            if not asks or len(asks) == 0:
-                return
-
-            # Берем лучший ask (наименьшая цена продажи)
-            best_ask = asks[0]
-            price = float(best_ask[0])
-            size = float(best_ask[1])
-
-            # Определяем сторону (yes/no) из данных
-            # Обычно это приходит в поле "asset" или "side"
-            side = data.get("asset", "yes").lower()
-
-            # Сохраняем в Redis
-            self.redis.set_orderbook(
-                market_id=market_id,
-                side=side,
-                price=price,
-                size=size,
-                timestamp=timestamp
-            )
+        # Явные guard-проверки вместо широкого try/except: быстрый путь
+        # без обработчика исключений, редкие кривые сообщения ловит
+        # узкий try вокруг диспетчеризации в listen()
+        market_id = data.get("market")
+
+        # Получаем лучшие цены продажи (asks) для Yes и No
+        # В Polymarket каждый исход торгуется отдельно
+        asks = data.get("asks")
+        if not market_id or not asks:
+            return
+
+        # time_ns(): целое вместо float и без датаклассов datetime
+        timestamp = data.get("timestamp") or time.time_ns()
 
+        # Берем лучший ask (наименьшая цена продажи)
+        best_ask = asks[0]
+        price = float(best_ask[0])
+        size = float(best_ask[1])
+
+        # Определяем сторону (yes/no) из данных
+        # Обычно это приходит в поле "asset" или "side"
+        side = data.get("asset", "yes").lower()
+
+        # Дедупликация: лучшая цена/объем не изменились —
+        # весь дальнейший путь (pipeline, сканер) не нужен
+        sig = (price, size)
+        book_key = (market_id, side)
+        if self._last_book.get(book_key) == sig:
+            return
+        self._last_book[book_key] = sig
+
+        # Кладем в буфер — фоновая задача сбросит пачкой в Redis.
+        # Поля уходят в хэш как есть, без JSON-сериализации
+        self._write_buffer.append((
+            market_id, side, price, size, timestamp
+        ))
+
+        # Guard: f-строка форматируется на каждом сообщении,
+        # даже когда DEBUG выключен — проверяем уровень заранее
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(
                 f"Orderbook updated | Market: {market_id} | "
                 f"Side: {side} | Price: {price:.4f} | Size: {size:.2f}"
             )
 
-        except Exception as e:
-            logger.error(f"Error processing orderbook update: {e}", exc_info=True)
+    @staticmethod
+    def _on_subscribed(data: dict):
+        """Подтверждение подписки"""
+        logger.info(f"Subscription confirmed for market: {data.get('market')}")
+
+    @staticmethod
+    def _on_error(data: dict):
+        """Сообщение об ошибке от сервера"""
+        logger.error(f"WebSocket error: {data.get('message')}")
+
+    async def _flusher(self):
+        """Фоновый сброс буфера записей в Redis одним pipeline"""
+        while self.running:
+            await asyncio.sleep(self._flush_interval)
+
+            # Продлеваем TTL застывших книг раз в полпериода истечения
+            now = time.monotonic()
+            if now >= self._ttl_refresh_deadline and self._last_book:
+                self._ttl_refresh_deadline = now + settings.REDIS_KEY_TTL / 2
+                await self.redis.refresh_book_ttls(
+                    {market_id for market_id, _ in self._last_book}
+                )
+
+            if not self._write_buffer:
+                continue
+
+            batch, self._write_buffer = self._write_buffer, []
+            await self.redis.pipeline_orderbook_updates(batch)
+            self._notify_updates(batch)
+
+    def _notify_updates(self, batch):
+        """Будим сканер по рынкам, чьи книги только что записаны"""
+        if self.update_queue is None:
+            return
+
+        # Уведомляем строго после записи в Redis, иначе сканер
+        # может проснуться раньше, чем данные доедут
+        for market_id in {item[0] for item in batch}:
+            try:
+                self.update_queue.put_nowait(market_id)
+            except asyncio.QueueFull:
+                # Сканер отстает — он прочитает свежие данные
+                # при следующем пробуждении, событие можно уронить
+                break
 
     async def listen(self):
         """Основной цикл прослушивания WebSocket"""
         self.running = True
 
-        while self.running:
-            try:
-                if not self.websocket:
-                    connected = await self.connect()
-                    if not connected:
-                        await asyncio.sleep(self.reconnect_delay)
-                        self.reconnect_delay = min(
-                            self.reconnect_delay * 2,
-                            self.max_reconnect_delay
-                        )
-                        continue
-
-                    # Подписываемся на рынки после подключения
-                    await self.subscribe_to_markets()
-                    self.reconnect_delay = 5  # Сброс задержки после успешного подключения
-
-                # Слушаем сообщения
-                message = await self.websocket.recv()
-                data = json.loads(message)
+        if not self.redis.connected:
+            await self.redis.connect()
+
+        self._flush_task = asyncio.create_task(self._flusher())
 
-                # Обработка разных типов сообщений
-                msg_type = data.get("type")
+        # Узкие try-блоки вместо одного широкого: у каждого этапа свой
+        # обработчик, быстрый путь проходит без лишних setup-опкодов
+        while self.running:
+            if not self.websocket:
+                connected = await self.connect()
+                if not connected:
+                    await asyncio.sleep(self.reconnect_delay)
+                    self.reconnect_delay = min(
+                        self.reconnect_delay * 2,
+                        self.max_reconnect_delay
+                    )
+                    continue
 
-                if msg_type == "book_update":
-                    self.process_orderbook_update(data)
-                elif msg_type == "subscribed":
-                    logger.info(f"Subscription confirmed for market: {data.get('market')}")
-                elif msg_type == "error":
-                    logger.error(f"WebSocket error: {data.get('message')}")
+                # Подписываемся на рынки после подключения
+                await self.subscribe_to_markets()
+                self.reconnect_delay = 5  # Сброс задержки после успешного подключения
 
+            # Слушаем сообщения
+            try:
+                message = await self.websocket.recv()
             except websockets.exceptions.ConnectionClosed:
                 logger.warning("WebSocket connection closed. Reconnecting...")
                 self.websocket = None
                 await asyncio.sleep(self.reconnect_delay)
+                continue
 
-            except json.JSONDecodeError as e:
+            # Бинарные фреймы отдаем orjson как есть (bytes),
+            # минуя UTF-8-декодирование на Python-стороне;
+            # str-фреймы он принимает так же
+            try:
+                data = _loads(message)
+            except ValueError as e:
+                # покрывает и json.JSONDecodeError, и orjson.JSONDecodeError
                 logger.error(f"Failed to decode JSON message: {e}")
+                continue
+
+            # Валидный JSON — не обязательно объект: сервер может
+            # прислать список или строку, а data.get на них упал бы
+            # AttributeError и убил весь цикл
+            if not isinstance(data, dict):
+                continue
 
-            except Exception as e:
-                logger.error(f"Unexpected error in listen loop: {e}", exc_info=True)
-                await asyncio.sleep(1)
+            # Обработка разных типов сообщений
+            handler = self._handlers.get(data.get("type"))
+            if handler is not None:
+                try:
+                    handler(data)
+                except Exception as e:
+                    logger.error(f"Error handling message: {e}")
 
     async def stop(self):
         """Остановка клиента"""
         self.running = False
+
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+        # Досылаем то, что осталось в буфере
+        if self._write_buffer:
+            batch, self._write_buffer = self._write_buffer, []
+            await self.redis.pipeline_orderbook_updates(batch)
+
         if self.websocket:
             await self.websocket.close()
             logger.info("WebSocket connection closed")
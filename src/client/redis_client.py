@@ -1,33 +1,76 @@
 import json
 import redis
+from redis import asyncio as aioredis
+from functools import lru_cache
 from typing import Optional, Dict, Any
 from config.settings import settings
 from src.utils.logger import setup_logger
 
+# orjson сериализует/парсит JSON в разы быстрее stdlib; значения
+# идут в Redis как bytes, поэтому decode_responses выключен
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
+
 logger = setup_logger("RedisClient")
 
+# Lua-скрипт: HGETALL по списку ключей одним вызовом EVALSHA —
+# один round-trip и никакого JSON-декодирования на пути сканера
+_SCAN_ALL_LUA = """
+local out = {}
+for i, key in ipairs(KEYS) do
+    out[i] = redis.call('HGETALL', key)
+end
+return out
+"""
+
 
 class RedisClient:
-    """Клиент для работы с Redis - быстрое хранилище данных о ценах"""
+    """
+    Клиент для работы с Redis - быстрое хранилище данных о ценах
+
+    Работает через redis.asyncio: каждый вызов отдает управление
+    event loop на время round-trip, вместо блокировки всего цикла
+    (WebSocket-приема и сканера) синхронным сокетом.
+    """
 
     def __init__(self):
-        self.client: Optional[redis.Redis] = None
+        self.client: Optional[aioredis.Redis] = None
         self.connected = False
-
-    def connect(self):
+        self._scan_all = None  # зарегистрированный Lua-скрипт
+
+        # Кэш ключей orderbook:{mid}: f-строка аллоцирует новый str
+        # на каждый вызов, а набор рынков мал и стабилен; bytes
+        # сериализуются в протокол Redis без лишнего encode
+        self._key_cache: Dict[str, bytes] = {}
+
+    def _book_key(self, market_id: str) -> bytes:
+        """Ключ хэша книги рынка (кэшируется)"""
+        key = self._key_cache.get(market_id)
+        if key is None:
+            key = f"orderbook:{market_id}".encode()
+            self._key_cache[market_id] = key
+        return key
+
+    async def connect(self):
         """Подключение к Redis"""
         try:
-            self.client = redis.Redis(
+            self.client = aioredis.Redis(
                 host=settings.REDIS_HOST,
                 port=settings.REDIS_PORT,
                 password=settings.REDIS_PASSWORD,
                 db=settings.REDIS_DB,
-                decode_responses=True,
+                decode_responses=False,
                 socket_connect_timeout=5,
                 socket_keepalive=True
             )
             # Проверка подключения
-            self.client.ping()
+            await self.client.ping()
+            self._scan_all = self.client.register_script(_SCAN_ALL_LUA)
             self.connected = True
             logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
             return True
@@ -36,18 +79,23 @@ class RedisClient:
             self.connected = False
             return False
 
-    def disconnect(self):
+    async def disconnect(self):
         """Отключение от Redis"""
         if self.client:
-            self.client.close()
+            await self.client.aclose()
             self.connected = False
             logger.info("Disconnected from Redis")
 
-    def set_orderbook(self, market_id: str, side: str, price: float,
-                      size: float, timestamp: float):
+    async def set_orderbook(self, market_id: str, side: str, price: float,
+                            size: float, timestamp: float):
         """
         Сохранение данных о стакане ордеров
 
+        Обе стороны рынка живут в одном хэше orderbook:{market_id}
+        с полями {side}_price / {side}_size / {side}_ts: три числа
+        не нуждаются в JSON-сериализации, а чтение обеих сторон —
+        один HGETALL вместо двух GET + двух json.loads.
+
         Args:
             market_id: ID рынка
             side: 'yes' или 'no'
@@ -58,25 +106,23 @@ class RedisClient:
         if not self.connected:
             return False
 
-        key = f"orderbook:{market_id}:{side}"
-        data = {
-            "price": price,
-            "size": size,
-            "timestamp": timestamp
-        }
+        key = self._book_key(market_id)
 
         try:
-            self.client.setex(
-                key,
-                settings.REDIS_KEY_TTL,
-                json.dumps(data)
-            )
+            pipe = self.client.pipeline(transaction=False)
+            pipe.hset(key, mapping={
+                f"{side}_price": price,
+                f"{side}_size": size,
+                f"{side}_ts": timestamp
+            })
+            pipe.expire(key, settings.REDIS_KEY_TTL)
+            await pipe.execute()
             return True
         except Exception as e:
             logger.error(f"Failed to set orderbook data: {e}")
             return False
 
-    def get_orderbook(self, market_id: str, side: str) -> Optional[Dict[str, Any]]:
+    async def get_orderbook(self, market_id: str, side: str) -> Optional[Dict[str, Any]]:
         """
         Получение данных о стакане ордеров
 
@@ -90,115 +136,282 @@ class RedisClient:
         if not self.connected:
             return None
 
-        key = f"orderbook:{market_id}:{side}"
+        key = self._book_key(market_id)
 
         try:
-            data = self.client.get(key)
-            if data:
-                return json.loads(data)
-            return None
+            price, size, ts = await self.client.hmget(
+                key, f"{side}_price", f"{side}_size", f"{side}_ts"
+            )
+            if price is None or size is None:
+                return None
+            return {
+                "best_ask": float(price),
+                "ask_size": float(size),
+                "timestamp": float(ts or 0)
+            }
         except Exception as e:
             logger.error(f"Failed to get orderbook data: {e}")
             return None
 
-    def get_both_sides(self, market_id: str) -> Optional[Dict[str, Dict]]:
+    @staticmethod
+    def _parse_book_hash(raw: dict) -> Optional[Dict[str, Dict]]:
+        """Разбор полей хэша orderbook:{mid} в {'yes': {...}, 'no': {...}}"""
+        if not raw:
+            return None
+
+        result = {}
+        for side in ("yes", "no"):
+            price = raw.get(f"{side}_price".encode())
+            size = raw.get(f"{side}_size".encode())
+            if price is None or size is None:
+                return None
+            ts = raw.get(f"{side}_ts".encode())
+            result[side] = {
+                "best_ask": float(price),
+                "ask_size": float(size),
+                "timestamp": float(ts or 0)
+            }
+        return result
+
+    def pipeline(self):
+        """
+        Пакетная отправка команд через pipeline
+
+        N команд уходят одним round-trip вместо N — вызывающий код
+        накапливает команды и делает один await execute() за итерацию.
+        """
+        return self.client.pipeline(transaction=False)
+
+    async def pipeline_orderbook_updates(self, items) -> bool:
+        """
+        Пакетная запись обновлений книг одним round-trip
+
+        Args:
+            items: Список кортежей (market_id, side, price, size, timestamp)
+        """
+        if not self.connected or not items:
+            return False
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for market_id, side, price, size, timestamp in items:
+                key = self._book_key(market_id)
+                pipe.hset(key, mapping={
+                    f"{side}_price": price,
+                    f"{side}_size": size,
+                    f"{side}_ts": timestamp
+                })
+                pipe.expire(key, settings.REDIS_KEY_TTL)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to execute orderbook pipeline: {e}")
+            return False
+
+    async def refresh_book_ttls(self, market_ids) -> bool:
+        """
+        Продление TTL книг одним pipeline
+
+        Нужно producer-у с дедупликацией: тихая книга не пишется
+        заново, но истекать из Redis не должна.
+        """
+        if not self.connected or not market_ids:
+            return False
+
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for market_id in market_ids:
+                pipe.expire(self._book_key(market_id), settings.REDIS_KEY_TTL)
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to refresh orderbook TTLs: {e}")
+            return False
+
+    async def get_both_sides(self, market_id: str) -> Optional[Dict[str, Dict]]:
         """
         Получение данных о обеих сторонах рынка (yes и no)
 
+        Один HGETALL вместо двух GET.
+
         Returns:
             Dict с ключами 'yes' и 'no' или None
         """
-        yes_data = self.get_orderbook(market_id, "yes")
-        no_data = self.get_orderbook(market_id, "no")
+        if not self.connected:
+            return None
 
-        if yes_data and no_data:
-            return {
-                "yes": yes_data,
-                "no": no_data
-            }
-        return None
+        try:
+            raw = await self.client.hgetall(self._book_key(market_id))
+            return self._parse_book_hash(raw)
+        except Exception as e:
+            logger.error(f"Failed to get orderbook data: {e}")
+            return None
+
+    async def get_orderbooks_bulk(self, market_ids) -> Dict[str, Dict[str, Dict]]:
+        """
+        Массовое чтение обеих сторон нескольких рынков одним вызовом
+
+        Lua-скрипт выполняет HGETALL по всем ключам на стороне сервера:
+        один round-trip на цикл сканирования вместо 2N отдельных GET,
+        и никакого JSON-декодирования — поля уже числа.
+
+        Args:
+            market_ids: Список ID рынков
+
+        Returns:
+            Dict {market_id: {'yes': {...}, 'no': {...}}}; рынки,
+            у которых нет данных по обеим сторонам, пропускаются
+        """
+        if not self.connected or not market_ids:
+            return {}
+
+        try:
+            replies = await self._scan_all(
+                keys=[self._book_key(m) for m in market_ids]
+            )
+        except Exception as e:
+            logger.error(f"Failed to bulk-get orderbooks: {e}")
+            return {}
+
+        result = {}
+        for market_id, reply in zip(market_ids, replies):
+            # EVAL возвращает HGETALL плоским списком [поле, значение, ...]
+            book = self._parse_book_hash(
+                dict(zip(reply[::2], reply[1::2]))
+            )
+            if book:
+                result[market_id] = book
+        return result
 
-    def set_market_status(self, market_id: str, status: str):
+    async def set_market_status(self, market_id: str, status: str):
         """Сохранение статуса рынка (active/halted/closed)"""
         if not self.connected:
             return False
 
         key = f"market:status:{market_id}"
         try:
-            self.client.setex(key, settings.REDIS_KEY_TTL * 10, status)
+            await self.client.setex(key, settings.REDIS_KEY_TTL * 10, status)
             return True
         except Exception as e:
             logger.error(f"Failed to set market status: {e}")
             return False
 
-    def get_market_status(self, market_id: str) -> Optional[str]:
+    async def get_market_status(self, market_id: str) -> Optional[str]:
         """Получение статуса рынка"""
         if not self.connected:
             return None
 
         key = f"market:status:{market_id}"
         try:
-            return self.client.get(key)
+            status = await self.client.get(key)
+            return status.decode() if status else None
         except Exception as e:
             logger.error(f"Failed to get market status: {e}")
             return None
 
-    def increment_trade_counter(self, date: str) -> int:
+    async def set_active_markets(self, market_ids: list):
+        """Сохранение списка активных рынков"""
+        if not self.connected:
+            return False
+
+        try:
+            await self.client.set("markets:active", _dumps(market_ids))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set active markets: {e}")
+            return False
+
+    async def set_bot_status(self, status: str):
+        """Сохранение статуса бота (running/stopped)"""
+        if not self.connected:
+            return False
+
+        try:
+            await self.client.set("bot:status", status)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set bot status: {e}")
+            return False
+
+    async def increment_opportunities_found(self) -> int:
+        """Инкремент счетчика найденных возможностей"""
+        if not self.connected:
+            return 0
+
+        try:
+            return await self.client.incr("stats:opportunities")
+        except Exception as e:
+            logger.error(f"Failed to increment opportunities counter: {e}")
+            return 0
+
+    async def get_stats(self) -> dict:
+        """Получение счетчиков работы бота"""
+        if not self.connected:
+            return {}
+
+        try:
+            opportunities = await self.client.get("stats:opportunities")
+            return {
+                "opportunities_found": int(opportunities or 0)
+            }
+        except Exception as e:
+            logger.error(f"Failed to get stats: {e}")
+            return {}
+
+    async def increment_trade_counter(self, date: str) -> int:
         """Увеличение счетчика сделок за день"""
         if not self.connected:
             return 0
 
         key = f"trades:count:{date}"
         try:
-            count = self.client.incr(key)
-            self.client.expire(key, 86400 * 2)  # 2 дня TTL
+            count = await self.client.incr(key)
+            await self.client.expire(key, 86400 * 2)  # 2 дня TTL
             return count
         except Exception as e:
             logger.error(f"Failed to increment trade counter: {e}")
             return 0
 
-    def set_daily_pnl(self, date: str, pnl: float):
+    async def set_daily_pnl(self, date: str, pnl: float):
         """Сохранение дневного P&L"""
         if not self.connected:
             return False
 
         key = f"pnl:daily:{date}"
         try:
-            self.client.setex(key, 86400 * 7, str(pnl))  # 7 дней TTL
+            await self.client.setex(key, 86400 * 7, str(pnl))  # 7 дней TTL
             return True
         except Exception as e:
             logger.error(f"Failed to set daily PnL: {e}")
             return False
 
-    def get_daily_pnl(self, date: str) -> float:
+    async def get_daily_pnl(self, date: str) -> float:
         """Получение дневного P&L"""
         if not self.connected:
             return 0.0
 
         key = f"pnl:daily:{date}"
         try:
-            pnl = self.client.get(key)
+            pnl = await self.client.get(key)
             return float(pnl) if pnl else 0.0
         except Exception as e:
             logger.error(f"Failed to get daily PnL: {e}")
             return 0.0
 
-    def health_check(self) -> bool:
+    async def health_check(self) -> bool:
         """Проверка работоспособности Redis"""
         try:
-            return self.client.ping() if self.client else False
+            return await self.client.ping() if self.client else False
         except:
             return False
 
 
-# Singleton instance
-_redis_client_instance = None
-
-
+@lru_cache(maxsize=None)
 def get_redis_client() -> RedisClient:
-    """Получение singleton экземпляра Redis клиента"""
-    global _redis_client_instance
-    if _redis_client_instance is None:
-        _redis_client_instance = RedisClient()
-        _redis_client_instance.connect()
-    return _redis_client_instance
\ No newline at end of file
+    """
+    Получение singleton экземпляра Redis клиента
+
+    Подключение асинхронное, поэтому выполняется вызывающим кодом:
+    await client.connect() при старте.
+    """
+    return RedisClient()
@@ -0,0 +1,66 @@
+"""
+JIT-ядро арифметики арбитража
+
+Чистая float-математика calculate_opportunity вынесена сюда и
+компилируется Numba в машинный код: без dispatch Python-методов
+и attribute-lookup на каждый рынок каждые 100 мс. cache=True
+сохраняет скомпилированный код на диск — повторные старты
+не платят за компиляцию.
+
+Без numba используется тот же код как обычная Python-функция.
+"""
+
+# Numba опциональна: при ее отсутствии ядро остается чистым Python
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _compute_opp_py(yes_ask, yes_size, no_ask, no_size,
+                    thr, min_profit, min_liq, max_pos):
+    """
+    Расчет возможности по лучшим ценам обеих сторон
+
+    Returns:
+        (sum_price, profit_percent, max_volume, expected_profit);
+        при отсутствии возможности profit_percent = -1.0
+    """
+    sum_price = yes_ask + no_ask
+
+    if sum_price >= thr:
+        return sum_price, -1.0, 0.0, 0.0
+
+    profit_percent = ((1.00 - sum_price) / sum_price) * 100.0
+
+    if profit_percent < min_profit:
+        return sum_price, -1.0, 0.0, 0.0
+
+    # Максимальный объем: покупаем одинаковое число акций обеих сторон
+    max_shares_yes = yes_size / yes_ask if yes_ask > 0 else 0.0
+    max_shares_no = no_size / no_ask if no_ask > 0 else 0.0
+    max_shares = max_shares_yes if max_shares_yes < max_shares_no else max_shares_no
+    max_volume = max_shares * sum_price
+
+    if max_volume < min_liq:
+        return sum_price, -1.0, 0.0, 0.0
+
+    if max_volume > max_pos:
+        max_volume = max_pos
+
+    expected_profit = max_volume * (1.00 - sum_price)
+
+    return sum_price, profit_percent, max_volume, expected_profit
+
+
+if njit is not None:
+    # Явная сигнатура = eager-компиляция прямо при импорте (без
+    # type inference на первом вызове); cache=True кладет машинный код
+    # в __pycache__/*.nbi — прогретый контейнер вообще не компилирует
+    compute_opp = njit(
+        'Tuple((f8, f8, f8, f8))(f8, f8, f8, f8, f8, f8, f8, f8)',
+        cache=True,
+        fastmath=True
+    )(_compute_opp_py)
+else:
+    compute_opp = _compute_opp_py
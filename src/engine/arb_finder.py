@@ -1,12 +1,19 @@
+import sys
+import time
 import asyncio
+import logging
+from operator import attrgetter
+import numpy as np
 from typing import List, Optional
-from datetime import datetime
-from src.clients.redis_client import redis_client
+from config.settings import settings
+from src.client.redis_client import get_redis_client
 from src.engine.calculator import ArbCalculator, ArbOpportunity
 from src.utils.logger import BotLogger
-from src.utils.notifier import notifier
+from src.utils.notifier import get_notifier
 
-logger = BotLogger("ArbFinder")
+logger = BotLogger()
+redis_client = get_redis_client()
+notifier = get_notifier()
 
 
 class ArbitrageFinder:
@@ -15,19 +22,36 @@ class ArbitrageFinder:
     Постоянно мониторит Redis на предмет появления аномалий P_yes + P_no < 1
     """
 
-    def __init__(self, scan_interval: float = 0.1):
+    def __init__(self, scan_interval: float = 0.1,
+                 update_queue: Optional[asyncio.Queue] = None):
         """
         Args:
             scan_interval: Интервал сканирования в секундах (0.1 = 100ms)
+            update_queue: Очередь market_id от WebSocket-клиента; если
+                задана, сканер событийный — проверяет рынок сразу после
+                обновления его книги вместо опроса по таймеру
         """
         self.scan_interval = scan_interval
+        self.update_queue = update_queue
         self.calculator = ArbCalculator()
         self.is_running = False
         self._active_markets: set = set()
 
+        # SoA-буферы цен/объемов (Structure of Arrays): четыре плоских
+        # массива вместо N словарей — условие арбитража считается одним
+        # векторизованным выражением по непрерывной FP64-памяти
+        self._order: List[str] = []
+        self._idx: dict = {}
+        self._yes_ask: Optional[np.ndarray] = None
+        self._yes_size: Optional[np.ndarray] = None
+        self._no_ask: Optional[np.ndarray] = None
+        self._no_size: Optional[np.ndarray] = None
+
         # Кэш для предотвращения дублирования уведомлений
+        # (моменты в monotonic-наносекундах: int вместо datetime —
+        # без аллокации объекта на каждую проверку)
         self._last_notified: dict = {}
-        self._notification_cooldown = 60  # секунд
+        self._notification_cooldown_ns = 60 * 1_000_000_000  # 60 секунд
 
     async def start(self, market_ids: List[str]):
         """
@@ -38,30 +62,116 @@ class ArbitrageFinder:
         """
         self.is_running = True
         self._active_markets = set(market_ids)
+        self._rebuild_index()
 
         logger.info(f"🔍 Arb Finder started, monitoring {len(market_ids)} markets")
         logger.info(f"📊 Scan interval: {self.scan_interval * 1000:.0f}ms")
 
+        if not redis_client.connected:
+            await redis_client.connect()
+
         # Сохраняем активные рынки в Redis
-        redis_client.set_active_markets(market_ids)
-        redis_client.set_bot_status("running")
+        await redis_client.set_active_markets(market_ids)
+        await redis_client.set_bot_status("running")
 
         try:
-            while self.is_running:
-                await self._scan_cycle()
-                await asyncio.sleep(self.scan_interval)
+            if self.update_queue is not None:
+                # Событийный режим: просыпаемся только на обновления
+                await self._event_loop()
+            else:
+                # Режим опроса: полный проход каждые scan_interval
+                while self.is_running:
+                    await self._scan_cycle()
+                    await asyncio.sleep(self.scan_interval)
         except Exception as e:
             logger.error(f"Arb Finder crashed: {e}", exc_info=True)
             await notifier.notify_error(f"Arb Finder crashed: {e}", critical=True)
         finally:
-            redis_client.set_bot_status("stopped")
+            await redis_client.set_bot_status("stopped")
+
+    def _rebuild_index(self):
+        """(Пере)выделение SoA-буферов под текущий набор рынков"""
+        # sys.intern: один и тот же десяток ID повторяется каждый скан —
+        # интернирование дает сравнение по указателю и без копий строк
+        self._order = [sys.intern(m) for m in self._active_markets]
+        self._idx = {market_id: i for i, market_id in enumerate(self._order)}
+        n = len(self._order)
+        self._yes_ask = np.empty(n)
+        self._yes_size = np.empty(n)
+        self._no_ask = np.empty(n)
+        self._no_size = np.empty(n)
+
+    async def _event_loop(self):
+        """
+        Событийный цикл: блокируемся на очереди обновлений и проверяем
+        только рынки, чьи книги реально изменились
+
+        Тихие рынки не стоят ни CPU, ни Redis QPS, а медианная задержка
+        обнаружения падает с ~50мс (полуинтервал опроса) до микросекунд
+        после записи книги.
+        """
+        while self.is_running:
+            market_id = await self.update_queue.get()
+
+            # Коалесценция: забираем все уже накопившиеся обновления,
+            # чтобы прочитать их одним bulk-запросом
+            dirty = {market_id}
+            while True:
+                try:
+                    dirty.add(self.update_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            dirty &= self._active_markets
+            if not dirty:
+                continue
+
+            orderbooks = await redis_client.get_orderbooks_bulk(list(dirty))
+
+            opportunities = []
+            for market_id, orderbook in orderbooks.items():
+                opportunity = self._check_market(market_id, orderbook)
+                if opportunity:
+                    opportunities.append(opportunity)
+
+            if opportunities:
+                await self._process_opportunities(opportunities)
 
     async def _scan_cycle(self):
         """Один цикл сканирования всех рынков"""
+        # Все книги за один MGET: 1 round-trip на цикл вместо 2N
+        orderbooks = await redis_client.get_orderbooks_bulk(self._order)
+
+        if not orderbooks:
+            return
+
+        # Заполняем SoA-буферы; NaN = нет данных, любое сравнение
+        # с NaN дает False и рынок автоматически выпадает из маски
+        ya, ys = self._yes_ask, self._yes_size
+        na, ns = self._no_ask, self._no_size
+        ya.fill(np.nan)
+        na.fill(np.nan)
+
+        for market_id, orderbook in orderbooks.items():
+            i = self._idx[market_id]
+            yes, no = orderbook['yes'], orderbook['no']
+            ya[i] = yes.get('best_ask') or np.nan
+            ys[i] = yes.get('ask_size') or 0.0
+            na[i] = no.get('best_ask') or np.nan
+            ns[i] = no.get('ask_size') or 0.0
+
+        # Векторизованный предикат: один C-проход по массивам
+        # вместо Python-вызова калькулятора на каждый рынок
+        sum_price = ya + na
+        profit = (1.0 - sum_price) / sum_price * 100.0
+        mask = (sum_price < settings.ARB_THRESHOLD) \
+            & (profit >= settings.MIN_PROFIT_PERCENT)
+
+        # Полный расчет (ликвидность, лимит позиции) — только для хитов
         opportunities = []
-
-        for market_id in self._active_markets:
-            opportunity = await self._check_market(market_id)
+        for i in np.flatnonzero(mask):
+            market_id = self._order[i]
+            opportunity = self._check_market(market_id, orderbooks[market_id])
             if opportunity:
                 opportunities.append(opportunity)
 
@@ -69,20 +179,18 @@ class ArbitrageFinder:
         if opportunities:
             await self._process_opportunities(opportunities)
 
-    async def _check_market(self, market_id: str) -> Optional[ArbOpportunity]:
+    def _check_market(self, market_id: str, orderbook: dict) -> Optional[ArbOpportunity]:
         """
         Проверка одного рынка на наличие арбитража
 
+        Args:
+            market_id: ID рынка
+            orderbook: Dict с ключами 'yes' и 'no' из bulk-чтения
+
         Returns:
             ArbOpportunity если найдена аномалия, иначе None
         """
         try:
-            # Получаем данные из Redis
-            orderbook = redis_client.get_both_sides(market_id)
-
-            if not orderbook:
-                return None
-
             # Расчет возможности
             opportunity = self.calculator.calculate_opportunity(
                 market_id=market_id,
@@ -103,73 +211,82 @@ class ArbitrageFinder:
         В этой версии: логирование и уведомления
         В полной версии: отправка в Execution Engine
         """
-        # Сортировка по прибыльности
-        opportunities.sort(key=lambda x: x.profit_percent, reverse=True)
-
-        for opp in opportunities:
-            # Инкремент счетчика
-            redis_client.increment_opportunities_found()
-
-            # Логирование
-            logger.opportunity_found(
-                opp.market_id,
-                opp.sum_price,
-                opp.profit_percent
-            )
+        # Сортировка по прибыльности: attrgetter реализован на C,
+        # без вызова Python-лямбды на каждый элемент
+        opportunities.sort(key=attrgetter('profit_percent'), reverse=True)
 
-            # Детальный вывод
-            logger.debug(
-                f"  YES: {opp.yes_ask_price:.4f} x {opp.yes_ask_size:.2f} | "
-                f"NO: {opp.no_ask_price:.4f} x {opp.no_ask_size:.2f}"
-            )
-            logger.debug(
-                f"  Max Volume: ${opp.max_volume:.2f} | "
-                f"Expected Profit: ${opp.expected_profit_usd:.2f}"
-            )
+        # Один замер времени на всю пачку
+        now_ns = time.monotonic_ns()
+
+        # Все возможности тика уходят в лог одной записью
+        with logger.tick():
+            for opp in opportunities:
+                # Инкремент счетчика
+                await redis_client.increment_opportunities_found()
 
-            # Уведомление в Telegram (с cooldown)
-            if self._should_notify(opp.market_id):
-                await notifier.notify_opportunity(
+                # Логирование
+                logger.opportunity_found(
                     opp.market_id,
-                    opp.sum_price,
+                    opp.yes_ask_price,
+                    opp.no_ask_price,
                     opp.profit_percent
                 )
-                self._last_notified[opp.market_id] = datetime.now()
 
-            # TODO: Отправить в Execution Engine
-            # await self.execution_engine.execute(opp)
-
-    def _should_notify(self, market_id: str) -> bool:
+                # Детальный вывод — float-форматирование только когда
+                # DEBUG действительно включен
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"  YES: {opp.yes_ask_price:.4f} x {opp.yes_ask_size:.2f} | "
+                        f"NO: {opp.no_ask_price:.4f} x {opp.no_ask_size:.2f}"
+                    )
+                    logger.debug(
+                        f"  Max Volume: ${opp.max_volume:.2f} | "
+                        f"Expected Profit: ${opp.expected_profit_usd:.2f}"
+                    )
+
+                # Уведомление в Telegram (с cooldown)
+                if self._should_notify(opp.market_id, now_ns):
+                    await notifier.notify_opportunity(
+                        opp.market_id,
+                        opp.yes_ask_price,
+                        opp.no_ask_price,
+                        opp.profit_percent
+                    )
+                    self._last_notified[opp.market_id] = now_ns
+
+                # TODO: Отправить в Execution Engine
+                # await self.execution_engine.execute(opp)
+
+    def _should_notify(self, market_id: str, now_ns: int) -> bool:
         """
         Проверка, нужно ли отправлять уведомление
         (чтобы не спамить при повторяющихся возможностях)
         """
-        if market_id not in self._last_notified:
-            return True
-
-        time_since_last = (datetime.now() - self._last_notified[market_id]).total_seconds()
-        return time_since_last > self._notification_cooldown
+        return now_ns - self._last_notified.get(market_id, 0) \
+            > self._notification_cooldown_ns
 
     def stop(self):
         """Остановка сканера"""
         self.is_running = False
         logger.info("🛑 Arb Finder stopped")
 
-    def add_market(self, market_id: str):
+    async def add_market(self, market_id: str):
         """Добавление рынка в мониторинг"""
         self._active_markets.add(market_id)
-        redis_client.set_active_markets(list(self._active_markets))
+        self._rebuild_index()
+        await redis_client.set_active_markets(list(self._active_markets))
         logger.info(f"➕ Added market to monitoring: {market_id[:16]}...")
 
-    def remove_market(self, market_id: str):
+    async def remove_market(self, market_id: str):
         """Удаление рынка из мониторинга"""
         self._active_markets.discard(market_id)
-        redis_client.set_active_markets(list(self._active_markets))
+        self._rebuild_index()
+        await redis_client.set_active_markets(list(self._active_markets))
         logger.info(f"➖ Removed market from monitoring: {market_id[:16]}...")
 
-    def get_stats(self) -> dict:
+    async def get_stats(self) -> dict:
         """Получение статистики работы"""
-        redis_stats = redis_client.get_stats()
+        redis_stats = await redis_client.get_stats()
         return {
             'active_markets': len(self._active_markets),
             'is_running': self.is_running,
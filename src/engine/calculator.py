@@ -1,12 +1,32 @@
 from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 from config.settings import settings
+from src.engine._calc_numba import compute_opp
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Снимок порогов при импорте: модульные имена вместо четырех
+# attribute-lookup через pydantic-объект на каждый рынок каждые 100 мс
+_ARB_THR = float(settings.ARB_THRESHOLD)
+_MIN_PROFIT = float(settings.MIN_PROFIT_PERCENT)
+_MIN_LIQ = float(settings.MIN_LIQUIDITY_USD)
+_MAX_POS = float(settings.MAX_POSITION_SIZE_USD)
 
-@dataclass
+
+def refresh_settings():
+    """Обновление снимка порогов после изменения настроек на лету"""
+    global _ARB_THR, _MIN_PROFIT, _MIN_LIQ, _MAX_POS
+    _ARB_THR = float(settings.ARB_THRESHOLD)
+    _MIN_PROFIT = float(settings.MIN_PROFIT_PERCENT)
+    _MIN_LIQ = float(settings.MIN_LIQUIDITY_USD)
+    _MAX_POS = float(settings.MAX_POSITION_SIZE_USD)
+
+
+# slots=True: фиксированные слоты вместо per-instance __dict__ —
+# вдвое меньше памяти и быстрее чтение атрибутов при множестве
+# экземпляров за скан; frozen=True — возможность неизменяема
+@dataclass(slots=True, frozen=True)
 class ArbOpportunity:
     """Структура данных для арбитражной возможности"""
     market_id: str
@@ -49,49 +69,33 @@ class ArbCalculator:
         Returns:
             ArbOpportunity если возможность есть, иначе None
         """
+        # Прямая индексация вместо .get(): меньше байткода и без
+        # аллокации списка на проверку None; отсутствие поля — редкий
+        # путь, его дешевле обработать через KeyError
         try:
-            yes_ask = yes_data.get('best_ask')
-            yes_size = yes_data.get('ask_size')
-            no_ask = no_data.get('best_ask')
-            no_size = no_data.get('ask_size')
-
-            # Проверка наличия всех необходимых данных
-            if None in [yes_ask, yes_size, no_ask, no_size]:
-                return None
-
-            # Расчет суммы цен
-            sum_price = yes_ask + no_ask
-
-            # Проверка порога
-            if sum_price >= settings.ARB_THRESHOLD:
-                return None
+            yes_ask = yes_data['best_ask']
+            yes_size = yes_data['ask_size']
+            no_ask = no_data['best_ask']
+            no_size = no_data['ask_size']
+        except KeyError:
+            return None
 
-            # Расчет потенциальной прибыли
-            # При покупке обоих исходов за sum_price получаем $1.00 в любом случае
-            profit_percent = ((1.00 - sum_price) / sum_price) * 100
+        if yes_ask is None or no_ask is None:
+            return None
 
-            # Проверка минимальной прибыли
-            if profit_percent < settings.MIN_PROFIT_PERCENT:
-                return None
+        try:
 
-            # Расчет максимального объема
-            max_volume = ArbCalculator._calculate_max_volume(
-                yes_ask, yes_size, no_ask, no_size
+            # Вся арифметика и пороги — в JIT-ядре (см. _calc_numba);
+            # здесь остаются только dict-lookup и сборка dataclass
+            sum_price, profit_percent, max_volume, expected_profit = compute_opp(
+                yes_ask, yes_size, no_ask, no_size,
+                _ARB_THR, _MIN_PROFIT, _MIN_LIQ, _MAX_POS
             )
 
-            if max_volume < settings.MIN_LIQUIDITY_USD:
-                logger.debug(
-                    f"Insufficient liquidity for {market_id[:8]}: "
-                    f"{max_volume:.2f} < {settings.MIN_LIQUIDITY_USD}"
-                )
+            # Сентинел: порог/прибыль/ликвидность не прошли
+            if profit_percent < 0:
                 return None
 
-            # Ограничение размера позиции
-            max_volume = min(max_volume, settings.MAX_POSITION_SIZE_USD)
-
-            # Расчет ожидаемой прибыли в USD
-            expected_profit = max_volume * (1.00 - sum_price)
-
             return ArbOpportunity(
                 market_id=market_id,
                 sum_price=sum_price,
@@ -1,8 +1,192 @@
+import atexit
+import io
 import logging
+import os
+import queue
 import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-import colorlog
+from logging.handlers import (
+    RotatingFileHandler,
+    QueueHandler,
+    QueueListener,
+)
+# Форматы логов не используют %(threadName)s/%(process)s/%(pathname)s,
+# поэтому отключаем их сбор: каждый LogRecord иначе платит за
+# sys._getframe-обход стека (findCaller), getpid и current_thread
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging._srcfile = None
+
+
+# Эмодзи-префиксы статусных записей как готовые константы: один str
+# на процесс вместо пересборки фрагмента с 4-байтовыми кодпоинтами
+# на каждый вызов
+_PREFIX_OPP = "🎯 OPPORTUNITY"
+_PREFIX_TRADE_OK = "✅ TRADE EXECUTED"
+_PREFIX_TRADE_FAIL = "❌ TRADE FAILED"
+_PREFIX_RISK = "🚨 RISK LIMIT HIT"
+_PREFIX_UP = "🟢"
+_PREFIX_DOWN = "🔴"
+
+
+class FastColorFormatter(logging.Formatter):
+    """
+    Цветной formatter без colorlog
+
+    Вместо словаря имен цветов и инъекции %(log_color)s на каждую
+    запись — готовая таблица levelno -> ANSI-префикс и одна
+    конкатенация вокруг стандартного format().
+    """
+
+    _COLORS = {
+        logging.DEBUG: "\x1b[36m",
+        logging.INFO: "\x1b[32m",
+        logging.WARNING: "\x1b[33m",
+        logging.ERROR: "\x1b[31m",
+        logging.CRITICAL: "\x1b[41;37m",
+    }
+    _RESET = "\x1b[0m"
+
+    def format(self, record):
+        prefix = self._COLORS.get(record.levelno, "")
+        if not prefix:
+            return super().format(record)
+        return prefix + super().format(record) + self._RESET
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler с буферизацией записи
+
+    Строки копятся в 64КБ-буфере BufferedWriter и уходят на диск одним
+    write() вместо syscall на каждую запись. WARNING и выше сбрасываются
+    немедленно, остальное — фоновым таймером раз в 5 секунд.
+    Ротация не страдает: doRollover закрывает поток, что сбрасывает буфер.
+    """
+
+    _FLUSH_INTERVAL = 5.0
+
+    def __init__(self, *args, **kwargs):
+        self._suppress_flush = False
+        super().__init__(*args, **kwargs)
+        # Приблизительный размер файла в памяти: стандартный
+        # shouldRollover делает seek/stat на каждую запись, что съедает
+        # заметную долю CPU у болтливых логгеров
+        try:
+            self._approx_size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._approx_size = 0
+        self._start_flush_timer()
+        atexit.register(self.flush)
+
+    def _open(self):
+        # buffering=0: файл открывается сырым FileIO, и 64КБ-буфер ниже
+        # остается единственным; обычный open('ab') сам вернул бы
+        # BufferedWriter, и flush() внешнего стека лишь перекладывал бы
+        # байты во внутренний 8КБ-буфер, не доводя их до диска
+        raw = open(self.baseFilename, 'ab', buffering=0)
+        return io.TextIOWrapper(
+            io.BufferedWriter(raw, buffer_size=65536),
+            encoding=self.encoding or 'utf-8',
+            write_through=False
+        )
+
+    def shouldRollover(self, record):
+        if self.maxBytes <= 0:
+            return False
+
+        # Быстрый путь: ведем счетчик байтов в памяти и не трогаем
+        # файловую систему, пока оценка не дошла до maxBytes
+        self._approx_size += len(self.format(record).encode('utf-8')) + 1
+        if self._approx_size < self.maxBytes:
+            return False
+
+        if super().shouldRollover(record):
+            return True
+
+        # Оценка разошлась с реальностью — синхронизируемся
+        # (stream уже спозиционирован родительской проверкой)
+        if self.stream:
+            self._approx_size = self.stream.tell()
+        return False
+
+    def doRollover(self):
+        super().doRollover()
+        self._approx_size = 0
+
+    def emit(self, record):
+        # StreamHandler.emit завершается безусловным flush() — он
+        # сбрасывал бы буфер на каждую запись; подавляем его и
+        # сбрасываем сами: важное сразу, остальное по таймеру
+        self._suppress_flush = True
+        try:
+            super().emit(record)
+        finally:
+            self._suppress_flush = False
+        if record.levelno >= logging.WARNING:
+            self.flush()
+
+    def flush(self):
+        if self._suppress_flush:
+            return
+        super().flush()
+
+    def _start_flush_timer(self):
+        timer = threading.Timer(self._FLUSH_INTERVAL, self._periodic_flush)
+        timer.daemon = True
+        timer.start()
+        self._flush_timer = timer
+
+    def _periodic_flush(self):
+        try:
+            self.flush()
+        finally:
+            self._start_flush_timer()
+
+
+# Формат логов
+_LOG_FORMAT = "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
+_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _make_file_handler(log_file: Path) -> BufferedRotatingFileHandler:
+    """Файловый handler с ротацией и буферизацией записи"""
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = BufferedRotatingFileHandler(
+        log_file,
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5,
+        encoding='utf-8'
+    )
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(
+        logging.Formatter(_LOG_FORMAT, datefmt=_DATE_FORMAT)
+    )
+    return file_handler
+
+
+def _attach_file_sink(logger: logging.Logger, log_file: Path):
+    """
+    Довешивание файлового sink к уже работающему QueueListener
+
+    Модули конфигурируют логгер при импорте без файла; когда main.py
+    позже передает LOG_FILE, sink достраивается в живой listener
+    вместо пересоздания handlers.
+    """
+    for handler in logger.handlers:
+        listener = getattr(handler, "listener", None)
+        if listener is None:
+            continue
+        if any(isinstance(sink, BufferedRotatingFileHandler)
+               for sink in listener.handlers):
+            return
+        listener.handlers = listener.handlers + (_make_file_handler(log_file),)
+        return
 
 
 def setup_logger(name: str, log_file: Path = None, level: str = "INFO"):
@@ -17,88 +201,178 @@ def setup_logger(name: str, log_file: Path = None, level: str = "INFO"):
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, level.upper()))
 
-    # Избегаем дублирования handlers
+    # Избегаем дублирования handlers; запрошенный позже файл
+    # при этом не теряется
     if logger.handlers:
+        if log_file:
+            _attach_file_sink(logger, log_file)
         return logger
 
-    # Формат логов
-    log_format = "%(log_color)s%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
-    date_format = "%Y-%m-%d %H:%M:%S"
-
-    # Консольный handler с цветами
-    console_handler = colorlog.StreamHandler(sys.stdout)
+    # Консольный handler с цветами; при перенаправлении вывода
+    # (не TTY) escape-коды не нужны
+    console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.DEBUG)
-    console_formatter = colorlog.ColoredFormatter(
-        log_format,
-        datefmt=date_format,
-        log_colors={
-            'DEBUG': 'cyan',
-            'INFO': 'green',
-            'WARNING': 'yellow',
-            'ERROR': 'red',
-            'CRITICAL': 'red,bg_white',
-        }
-    )
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    formatter_cls = FastColorFormatter if sys.stdout.isatty() else logging.Formatter
+    console_handler.setFormatter(formatter_cls(_LOG_FORMAT, datefmt=_DATE_FORMAT))
+
+    # Реальные handlers (консоль + файл) живут на фоновом
+    # QueueListener-потоке: logger.info() из асинхронного горячего пути
+    # стоит Queue.put_nowait вместо блокирующего write() в event loop
+    sinks = [console_handler]
 
-    # Файловый handler с ротацией
     if log_file:
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        file_handler = RotatingFileHandler(
-            log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(logging.DEBUG)
-        file_formatter = logging.Formatter(
-            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-            datefmt=date_format
-        )
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        sinks.append(_make_file_handler(log_file))
+
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *sinks, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+
+    queue_handler = QueueHandler(log_queue)
+    # Ссылка на listener, как это делает logging.config —
+    # пригодится для принудительного flush
+    queue_handler.listener = listener
+    logger.addHandler(queue_handler)
 
     return logger
 
 
 class BotLogger:
-    """Специализированный логгер для арбитражного бота"""
+    """Специализированный логгер для арбитражного бота (singleton)"""
+
+    _instance = None
+
+    def __new__(cls, log_file: Path = None):
+        # Один экземпляр на процесс: повторные конструкции (рестарты,
+        # тесты, несколько сканеров) не пересоздают handlers
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
 
     def __init__(self, log_file: Path = None):
+        if hasattr(self, "logger"):
+            # Singleton уже захвачен модульным BotLogger() без файла;
+            # поздний вызов с log_file (main.py) доустанавливает
+            # файловый sink вместо молчаливого игнорирования аргумента
+            if log_file is not None:
+                setup_logger("ArbBot", log_file)
+            return
         self.logger = setup_logger("ArbBot", log_file)
+        # Связанный метод кэшируем: без attribute-lookup на каждый вызов
+        self._info = self.logger.info
+
+        # Дедупликация OPPORTUNITY-записей: то же ведро цен
+        # (шаг 0.001) не пишется в лог чаще раза в минуту
+        self._seen = OrderedDict()
+        self._seen_cap = 4096
+        self._seen_ttl = 60.0
+
+        # Буфер текущего тика: внутри with tick() возможности копятся
+        # и уходят одной многострочной записью вместо N записей
+        self._tick_buf = None
+
+    def begin_tick(self):
+        """Начало тика сканирования: возможности копятся в буфер"""
+        self._tick_buf = []
+
+    def end_tick(self):
+        """Конец тика: буфер уходит одной записью"""
+        buf, self._tick_buf = self._tick_buf, None
+        if not buf:
+            return
+        self._emit_preformatted(logging.INFO, "\n".join(
+            "%s | Market: %s | Yes: %.4f | No: %.4f | "
+            "Sum: %.4f | Profit: %.2f%%"
+            % (_PREFIX_OPP, market_id, yes_price, no_price,
+               yes_price + no_price, profit)
+            for market_id, yes_price, no_price, profit in buf
+        ))
+
+    @contextmanager
+    def tick(self):
+        """Скобки одного тика сканирования вокруг цикла обработки"""
+        self.begin_tick()
+        try:
+            yield self
+        finally:
+            self.end_tick()
 
     def opportunity_found(self, market_id: str, yes_price: float, no_price: float, profit: float):
         """Логирование найденной возможности"""
-        self.logger.info(
-            f"🎯 OPPORTUNITY | Market: {market_id} | "
-            f"Yes: {yes_price:.4f} | No: {no_price:.4f} | "
-            f"Sum: {yes_price + no_price:.4f} | Profit: {profit:.2f}%"
+        # Guard + ленивое %-форматирование: float->str и конкатенация
+        # выполняются только для записей, которые реально будут выведены
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+
+        key = (market_id, int(yes_price * 1000), int(no_price * 1000))
+        now = time.monotonic()
+        ts = self._seen.get(key)
+        if ts is not None and now - ts < self._seen_ttl:
+            return
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self._seen_cap:
+            self._seen.popitem(last=False)
+
+        # Внутри тика — только накопление, одна запись в end_tick
+        if self._tick_buf is not None:
+            self._tick_buf.append((market_id, yes_price, no_price, profit))
+            return
+
+        self._info(
+            "%s | Market: %s | Yes: %.4f | No: %.4f | "
+            "Sum: %.4f | Profit: %.2f%%",
+            _PREFIX_OPP, market_id, yes_price, no_price,
+            yes_price + no_price, profit
         )
 
     def trade_executed(self, market_id: str, volume: float, expected_profit: float):
         """Логирование выполненной сделки"""
-        self.logger.info(
-            f"✅ TRADE EXECUTED | Market: {market_id} | "
-            f"Volume: ${volume:.2f} | Expected Profit: {expected_profit:.2f}%"
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self._info(
+            "%s | Market: %s | Volume: $%.2f | Expected Profit: %.2f%%",
+            _PREFIX_TRADE_OK, market_id, volume, expected_profit
         )
 
     def trade_failed(self, market_id: str, reason: str):
         """Логирование неудачной сделки"""
         self.logger.error(
-            f"❌ TRADE FAILED | Market: {market_id} | Reason: {reason}"
+            "%s | Market: %s | Reason: %s",
+            _PREFIX_TRADE_FAIL, market_id, reason
         )
 
     def risk_limit_hit(self, limit_type: str, value: float):
         """Логирование достижения риск-лимита"""
         self.logger.critical(
-            f"🚨 RISK LIMIT HIT | Type: {limit_type} | Value: {value}"
+            "%s | Type: %s | Value: %s", _PREFIX_RISK, limit_type, value
         )
 
     def connection_status(self, service: str, status: str):
         """Логирование статуса подключения"""
-        emoji = "🟢" if status == "connected" else "🔴"
-        self.logger.info(f"{emoji} {service.upper()} | Status: {status}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        emoji = _PREFIX_UP if status == "connected" else _PREFIX_DOWN
+        self._info("%s %s | Status: %s", emoji, service.upper(), status)
+
+    def _emit_preformatted(self, level: int, preformatted: str):
+        """
+        Запись уже отформатированной строки без повторного format
+
+        Вызывающий код форматирует пачку возможностей один раз и
+        отдает готовую строку — LogRecord создается напрямую, минуя
+        %-подстановку на каждую запись.
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        record = self.logger.makeRecord(
+            self.logger.name, level, "", 0, preformatted, (), None
+        )
+        self.logger.handle(record)
+
+    def opportunity_found_raw(self, preformatted: str):
+        """Быстрый путь opportunity_found для заранее собранных строк"""
+        self._emit_preformatted(logging.INFO, preformatted)
 
     def info(self, msg: str):
         self.logger.info(msg)
@@ -110,4 +384,17 @@ class BotLogger:
         self.logger.error(msg, exc_info=exc_info)
 
     def debug(self, msg: str):
-        self.logger.debug(msg)
\ No newline at end of file
+        self.logger.debug(msg)
+
+    def isEnabledFor(self, level: int) -> bool:
+        """Проверка уровня до форматирования сообщения на горячем пути"""
+        return self.logger.isEnabledFor(level)
+
+    def flush(self):
+        """Принудительный сброс буферизованных handlers на диск"""
+        for handler in self.logger.handlers:
+            listener = getattr(handler, "listener", None)
+            if listener is not None:
+                for sink in listener.handlers:
+                    sink.flush()
+            handler.flush()
\ No newline at end of file
@@ -1,108 +1,307 @@
 import asyncio
+import collections
+import time
+from functools import lru_cache
 from typing import Optional
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import NetworkError, RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 from config.settings import settings
 from src.utils.logger import setup_logger
 
 logger = setup_logger("Notifier")
 
+# Шаблоны сообщений компилируются один раз: format() проходит шаблон
+# за один проход вместо аллокации 6-8 промежуточных строк f-конкатенацией
+_OPP_TMPL = (
+    "🎯 <b>Arbitrage Opportunity</b>\n\n"
+    "Market: <code>{market_id}</code>\n"
+    "Yes Price: {yes:.4f}\n"
+    "No Price: {no:.4f}\n"
+    "Sum: {s:.4f}\n"
+    "Expected Profit: <b>{profit:.2f}%</b>"
+)
+
+_TRADE_TMPL = (
+    "{emoji} <b>Trade {status}</b>\n\n"
+    "Market: <code>{market_id}</code>\n"
+    "Volume: ${volume:.2f}\n"
+    "Expected Profit: {profit:.2f}%"
+)
+
+_ALERT_TMPL = "🚨 <b>RISK ALERT: {alert_type}</b>\n\n{message}"
+
+_ERROR_TMPL = "{emoji} <b>ERROR</b>\n\n{message}"
+
+_STATUS_TMPL = "{emoji} <b>Bot {status}</b>\n\n{details}"
+
+_REPORT_TMPL = (
+    "📊 <b>Daily Report</b>\n\n"
+    "Trades: {trades}\n"
+    "Total Profit: ${profit:.2f}\n"
+    "Volume: ${volume:.2f}\n"
+    "Win Rate: {win_rate:.1f}%"
+)
+
 
 class TelegramNotifier:
     """Отправка уведомлений в Telegram"""
 
+    # Общий HTTP-клиент для всех экземпляров: одно пулированное
+    # соединение к api.telegram.org вместо TLS-рукопожатия на каждый
+    # новый Bot; мультиплексирование позволяет AIMD поднимать
+    # параллелизм без новых соединений
+    _shared_request: Optional[HTTPXRequest] = None
+    # Счетчик экземпляров на общем пуле: close() одного notifier не
+    # должен гасить соединения, которыми еще пользуются остальные
+    _shared_refs: int = 0
+
     def __init__(self, token: str = None, chat_id: str = None):
         self.token = token or settings.TELEGRAM_BOT_TOKEN
         self.chat_id = chat_id or settings.TELEGRAM_CHAT_ID
         self.enabled = settings.TELEGRAM_ENABLED and bool(self.token and self.chat_id)
         self.bot: Optional[Bot] = None
 
+        # Проактивный rate limit под лимиты Telegram (1 msg/s в чат,
+        # 20 msg/min): ждем своего слота сами, вместо того чтобы ловить
+        # 429 и платить за серверный backoff
+        self._min_interval = 1.0
+        self._last_sent = 0.0
+        self._window = collections.deque(maxlen=20)
+        self._rate_lock = asyncio.Lock()
+
+        # Очередь исходящих: вызывающий код кладет сообщение и сразу
+        # возвращается, сетевые 100-500 мс Telegram-round-trip платит
+        # фоновый воркер, коалесцируя близкие сообщения в одно.
+        # Создаются лениво — в __init__ event loop еще может не быть
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # AIMD-регулятор параллелизма отправок (как congestion control
+        # в TCP): успех — аддитивный рост на 0.5, 429/сетевая ошибка —
+        # мультипликативное снижение вдвое
+        self._c = 4.0
+        self._c_min = 1.0
+        self._c_max = 16.0
+        self._sem = asyncio.Semaphore(int(self._c))
+
+        # Дедупликация: один и тот же рынок с почти теми же ценами
+        # триггерит notify_opportunity много раз в секунду; ведро
+        # (market_id, цены с шагом 0.001) молчит 60с после отправки
+        self._seen = collections.OrderedDict()
+        self._seen_cap = 4096
+        self._seen_ttl = 60.0
+
         if self.enabled:
-            self.bot = Bot(token=self.token)
+            if TelegramNotifier._shared_request is None:
+                TelegramNotifier._shared_request = HTTPXRequest(
+                    connection_pool_size=8,
+                    pool_timeout=1.0
+                )
+            TelegramNotifier._shared_refs += 1
+            self.bot = Bot(token=self.token, request=self._shared_request)
             logger.info("Telegram notifier initialized")
         else:
             logger.warning("Telegram notifier disabled (missing credentials)")
 
-    async def send_message(self, message: str, parse_mode: str = "HTML"):
-        """Отправка сообщения в Telegram"""
+    def _is_duplicate(self, market_id: str, yes_price: float,
+                      no_price: float) -> bool:
+        """Проверка/регистрация ведра цен в LRU-кэше дедупликации"""
+        key = (market_id, int(yes_price * 1000), int(no_price * 1000))
+        now = time.monotonic()
+
+        ts = self._seen.get(key)
+        if ts is not None and now - ts < self._seen_ttl:
+            return True
+
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self._seen_cap:
+            self._seen.popitem(last=False)
+        return False
+
+    async def _acquire_slot(self):
+        """Ожидание свободного слота в rate-лимитах Telegram"""
+        async with self._rate_lock:
+            now = time.monotonic()
+            delay = self._min_interval - (now - self._last_sent)
+
+            # Скользящее окно: 20-е сообщение за последнюю минуту
+            # ждет, пока самое старое не выйдет из окна
+            if len(self._window) == self._window.maxlen:
+                oldest = self._window[0]
+                if now - oldest < 60.0:
+                    delay = max(delay, 60.0 - (now - oldest))
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+                now = time.monotonic()
+
+            self._last_sent = now
+            self._window.append(now)
+
+    async def send_message(self, message: str, parse_mode: str = "HTML",
+                           urgent: bool = False):
+        """
+        Отправка сообщения в Telegram
+
+        Обычные сообщения уходят через очередь с коалесценцией;
+        urgent (риск-алерты) — немедленно, минуя батчинг.
+        """
         if not self.enabled:
             return False
 
+        if urgent:
+            return await self._send_now(message, parse_mode)
+
+        self._ensure_worker()
         try:
-            await self.bot.send_message(
-                chat_id=self.chat_id,
-                text=message,
-                parse_mode=parse_mode
-            )
+            self._queue.put_nowait((message, parse_mode))
             return True
-        except TelegramError as e:
-            logger.error(f"Failed to send Telegram message: {e}")
+        except asyncio.QueueFull:
+            logger.warning("Notification queue full, dropping message")
             return False
 
+    def _ensure_worker(self):
+        """Ленивый запуск фонового отправителя"""
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=1000)
+            self._worker = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        """Фоновый воркер: до 5 сообщений за 0.5с склеиваются в одно"""
+        while True:
+            message, parse_mode = await self._queue.get()
+            batch = [message]
+
+            while len(batch) < 5:
+                try:
+                    next_msg, _ = await asyncio.wait_for(
+                        self._queue.get(), timeout=0.5
+                    )
+                except asyncio.TimeoutError:
+                    break
+                batch.append(next_msg)
+
+            await self._send_now("\n\n---\n\n".join(batch), parse_mode)
+
+    def _aimd_shrink(self):
+        """Мультипликативное снижение лимита параллелизма"""
+        new_c = max(self._c_min, self._c * 0.5)
+        if int(new_c) < int(self._c):
+            # Пересоздаем семафор с меньшей емкостью; держатели
+            # старого дорабатывают, новые отправки видят новый лимит
+            self._sem = asyncio.Semaphore(int(new_c))
+        self._c = new_c
+
+    def _aimd_grow(self):
+        """Аддитивный рост лимита параллелизма"""
+        new_c = min(self._c_max, self._c + 0.5)
+        if int(new_c) > int(self._c):
+            self._sem.release()
+        self._c = new_c
+
+    async def _send_now(self, message: str, parse_mode: str = "HTML"):
+        """Непосредственная отправка с учетом rate-лимитов и AIMD"""
+        async with self._sem:
+            await self._acquire_slot()
+
+            try:
+                await self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=message,
+                    parse_mode=parse_mode
+                )
+            except RetryAfter as e:
+                # Сервер сам сказал, сколько ждать — ждем и сжимаемся
+                logger.warning(f"Telegram rate limit, retry in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+                self._aimd_shrink()
+                return False
+            except (NetworkError, TelegramError) as e:
+                logger.error(f"Failed to send Telegram message: {e}")
+                self._aimd_shrink()
+                return False
+
+        self._aimd_grow()
+        return True
+
     async def notify_opportunity(self, market_id: str, yes_price: float,
                                  no_price: float, profit: float):
         """Уведомление о найденной возможности"""
-        message = (
-            f"🎯 <b>Arbitrage Opportunity</b>\n\n"
-            f"Market: <code>{market_id}</code>\n"
-            f"Yes Price: {yes_price:.4f}\n"
-            f"No Price: {no_price:.4f}\n"
-            f"Sum: {yes_price + no_price:.4f}\n"
-            f"Expected Profit: <b>{profit:.2f}%</b>"
+        if self._is_duplicate(market_id, yes_price, no_price):
+            return
+
+        message = _OPP_TMPL.format(
+            market_id=market_id, yes=yes_price, no=no_price,
+            s=yes_price + no_price, profit=profit
         )
         await self.send_message(message)
 
     async def notify_trade(self, market_id: str, volume: float,
                            expected_profit: float, success: bool = True):
         """Уведомление о выполненной сделке"""
-        emoji = "✅" if success else "❌"
-        status = "Executed" if success else "Failed"
-
-        message = (
-            f"{emoji} <b>Trade {status}</b>\n\n"
-            f"Market: <code>{market_id}</code>\n"
-            f"Volume: ${volume:.2f}\n"
-            f"Expected Profit: {expected_profit:.2f}%"
+        message = _TRADE_TMPL.format(
+            emoji="✅" if success else "❌",
+            status="Executed" if success else "Failed",
+            market_id=market_id, volume=volume, profit=expected_profit
         )
         await self.send_message(message)
 
     async def notify_risk_alert(self, alert_type: str, message: str):
         """Критическое уведомление о рисках"""
-        alert_message = (
-            f"🚨 <b>RISK ALERT: {alert_type}</b>\n\n"
-            f"{message}"
+        await self.send_message(
+            _ALERT_TMPL.format(alert_type=alert_type, message=message),
+            urgent=True
+        )
+
+    async def notify_error(self, message: str, critical: bool = False):
+        """Уведомление об ошибке в работе бота"""
+        await self.send_message(
+            _ERROR_TMPL.format(
+                emoji="🚨" if critical else "⚠️",
+                message=message
+            ),
+            urgent=critical
         )
-        await self.send_message(alert_message)
 
     async def notify_bot_status(self, status: str, details: str = ""):
         """Уведомление о статусе бота"""
-        emoji = "🟢" if status == "started" else "🔴"
-        message = (
-            f"{emoji} <b>Bot {status.upper()}</b>\n\n"
-            f"{details}"
+        message = _STATUS_TMPL.format(
+            emoji="🟢" if status == "started" else "🔴",
+            status=status.upper(),
+            details=details
         )
         await self.send_message(message)
 
+    async def close(self):
+        """Завершение работы: гасим воркер и общий HTTP-клиент"""
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+        # Общий пул гасим только вместе с последним экземпляром:
+        # другие notifier держат Bot поверх того же HTTPXRequest
+        if self.bot is not None:
+            self.bot = None
+            TelegramNotifier._shared_refs -= 1
+            if (TelegramNotifier._shared_refs == 0
+                    and TelegramNotifier._shared_request is not None):
+                await TelegramNotifier._shared_request.shutdown()
+                TelegramNotifier._shared_request = None
+
     async def notify_daily_report(self, trades_count: int, profit: float,
                                   volume: float, win_rate: float):
         """Ежедневный отчет"""
-        message = (
-            f"📊 <b>Daily Report</b>\n\n"
-            f"Trades: {trades_count}\n"
-            f"Total Profit: ${profit:.2f}\n"
-            f"Volume: ${volume:.2f}\n"
-            f"Win Rate: {win_rate:.1f}%"
+        message = _REPORT_TMPL.format(
+            trades=trades_count, profit=profit,
+            volume=volume, win_rate=win_rate
         )
         await self.send_message(message)
 
 
-# Singleton instance
-_notifier_instance = None
-
-
+@lru_cache(maxsize=None)
 def get_notifier() -> TelegramNotifier:
     """Получение singleton экземпляра notifier"""
-    global _notifier_instance
-    if _notifier_instance is None:
-        _notifier_instance = TelegramNotifier()
-    return _notifier_instance
\ No newline at end of file
+    return TelegramNotifier()
\ No newline at end of file